@@ -3,13 +3,45 @@ Configuration loader for the WP→PrestaShop migration tool.
 Reads and validates a YAML configuration file.
 """
 
+import copy
 import os
 import sys
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
+from functools import cached_property
 from typing import Optional
 
 import yaml
 
+# Prefer the LibYAML C bindings; fall back to the pure-Python implementation
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:  # PyYAML built without LibYAML
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+
+# Parsed YAML documents keyed by path → (st_mtime_ns, st_size, data); callers get deep copies
+_CONFIG_CACHE: dict[str, tuple[int, int, dict]] = {}
+
+
+def read_yaml(path: str) -> dict:
+    """Parse a YAML file, reusing the previous result while the file is unchanged."""
+    st = os.stat(path)
+    cached = _CONFIG_CACHE.get(path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return copy.deepcopy(cached[2])
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=YamlLoader) or {}
+    _CONFIG_CACHE[path] = (st.st_mtime_ns, st.st_size, copy.deepcopy(data))
+    return data
+
+
+def write_yaml(path: str, data: dict) -> None:
+    """Dump a dict to a YAML file and refresh its cache entry."""
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.dump(data, f, Dumper=YamlDumper, default_flow_style=False, allow_unicode=True, sort_keys=False)
+    st = os.stat(path)
+    _CONFIG_CACHE[path] = (st.st_mtime_ns, st.st_size, copy.deepcopy(data))
+
 
 @dataclass
 class WordPressConfig:
@@ -17,11 +49,11 @@ class WordPressConfig:
     username: str = ""
     app_password: str = ""
 
-    @property
+    @cached_property
     def has_auth(self) -> bool:
         return bool(self.username and self.app_password)
 
-    @property
+    @cached_property
     def api_base(self) -> str:
         return f"{self.url.rstrip('/')}/wp-json/wp/v2"
 
@@ -33,7 +65,7 @@ class PrestaShopConfig:
     default_lang_id: int = 1
     cms_category_id: int = 1
 
-    @property
+    @cached_property
     def api_base(self) -> str:
         return f"{self.url.rstrip('/')}/api"
 
@@ -67,69 +99,38 @@ class AppConfig:
     mapping: MappingConfig = field(default_factory=MappingConfig)
 
 
+def _build_section(cls: type, raw: dict):
+    """Instantiate a config dataclass from a raw YAML section, keeping field defaults."""
+    names = {f.name for f in fields(cls)}
+    return cls(**{k: v for k, v in raw.items() if k in names})
+
+
 def load_config(config_path: str) -> AppConfig:
     """Load and validate configuration from a YAML file."""
     if not os.path.exists(config_path):
         raise ValueError(f"Fichier de configuration introuvable : {config_path}")
 
-    with open(config_path, "r", encoding="utf-8") as f:
-        raw = yaml.safe_load(f)
-
+    raw = read_yaml(config_path)
     if not raw:
         raise ValueError("Le fichier de configuration est vide.")
 
-    # Validate required sections
+    # Validate required sections and keys
     for section in ["wordpress", "prestashop"]:
         if section not in raw:
             raise ValueError(f"Section '{section}' manquante dans la configuration.")
 
-    # Build WordPress config
     wp_raw = raw["wordpress"]
     if not wp_raw.get("url"):
         raise ValueError("wordpress.url est requis — configurez l'URL WordPress.")
-    wp_config = WordPressConfig(
-        url=wp_raw["url"],
-        username=wp_raw.get("username", ""),
-        app_password=wp_raw.get("app_password", ""),
-    )
-
-    # Build PrestaShop config
     ps_raw = raw["prestashop"]
     if not ps_raw.get("url"):
         raise ValueError("prestashop.url est requis — configurez l'URL PrestaShop.")
     if not ps_raw.get("api_key"):
         raise ValueError("prestashop.api_key est requis — configurez la clé API PrestaShop.")
-    ps_config = PrestaShopConfig(
-        url=ps_raw["url"],
-        api_key=ps_raw["api_key"],
-        default_lang_id=ps_raw.get("default_lang_id", 1),
-        cms_category_id=ps_raw.get("cms_category_id", 1),
-    )
-
-    # Build Migration config
-    mig_raw = raw.get("migration", {})
-    mig_config = MigrationConfig(
-        dry_run=mig_raw.get("dry_run", False),
-        log_file=mig_raw.get("log_file", "migration.log"),
-        download_images=mig_raw.get("download_images", True),
-        image_temp_dir=mig_raw.get("image_temp_dir", "temp_images"),
-        image_target_dir=mig_raw.get("image_target_dir", ""),
-        ftp_host=mig_raw.get("ftp_host", ""),
-        ftp_user=mig_raw.get("ftp_user", ""),
-        ftp_password=mig_raw.get("ftp_password", ""),
-        ftp_remote_path=mig_raw.get("ftp_remote_path", "/img/cms"),
-    )
-
-    # Build Mapping config
-    map_raw = raw.get("mapping", {})
-    map_config = MappingConfig(
-        rules=map_raw.get("rules", []),
-        default=map_raw.get("default", "skip"),
-    )
 
     return AppConfig(
-        wordpress=wp_config,
-        prestashop=ps_config,
-        migration=mig_config,
-        mapping=map_config,
+        wordpress=_build_section(WordPressConfig, wp_raw),
+        prestashop=_build_section(PrestaShopConfig, ps_raw),
+        migration=_build_section(MigrationConfig, raw.get("migration") or {}),
+        mapping=_build_section(MappingConfig, raw.get("mapping") or {}),
     )
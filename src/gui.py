@@ -6,27 +6,61 @@ Serves the SPA frontend and provides JSON API endpoints.
 Launch: python -m src.gui [--port 8585]
 """
 
+import gzip
+import hashlib
 import html
 import json
 import logging
+import multiprocessing
 import os
 import re
 import sys
+import tempfile
 import threading
 import webbrowser
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from functools import partial
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from socketserver import ThreadingMixIn
+from itertools import islice
+from operator import itemgetter
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import Any, Optional
 from urllib.parse import parse_qs, urlparse
 
 import requests
-import yaml
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import read_yaml, write_yaml
+from .gui_assets import (
+    CSS_PATH, CSS_VARIANTS, HTML_ETAGS, HTML_VARIANTS, accepts_encoding, get_css_bytes, get_html_bytes,
+)
+
+# orjson serializes straight to UTF-8 bytes; stdlib json is the fallback
+try:
+    import orjson
+
+    def _json_dumps(data: Any) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    _json_loads = json.loads
 
 logger = logging.getLogger("wp2presta.gui")
 
 # ── Shared state ─────────────────────────────────────────────────
 
+MIGRATION_LOG_MAX = 2000  # older lines are dropped during long migrations
+SAVE_DEBOUNCE = 0.5       # seconds to wait for further edits before writing config.yaml
+_BOOT = os.urandom(4).hex()  # per-process ETag prefix: _version restarts at 0 with each server
+
+
 class AppState:
     """Holds all shared state for the GUI session."""
 
@@ -35,17 +69,30 @@ class AppState:
         self.wp_pages: list[dict] = []
         self.analyzed: list[dict] = []
         self.assignments: dict[str, str] = {}     # slug → target
+        self._target_counts: Counter = Counter()  # target → number of slugs, kept in step with assignments
         self.page_options: dict[str, dict] = {}   # slug → {cms_category_id, product_id, product_reference, match_by}
-        self.migration_log: list[str] = []
+        self._by_slug: dict[str, list[dict]] = {}  # slug → analyzed pages (posts and pages may share a slug)
+        self.wp_types: list[str] = []              # column parallel to analyzed, for C-level Counter()
+        self.migration_log: deque[str] = deque(maxlen=MIGRATION_LOG_MAX)
+        self.migration_log_total: int = 0          # lines appended since begin_migration()
         self.migration_running: bool = False
         self.migration_progress: dict = {"current": 0, "total": 0, "status": "idle"}
+        self.migration_cond = threading.Condition()  # wakes /api/migrate/stream listeners
         self.config_path: str = "config.yaml"
+        self.lock = threading.RLock()              # guards analyzed/assignments/page_options across request threads
+        self._last_saved_hash: bytes = b""         # digest of the config as last written
+        self._version: int = 0                     # bumped on every change to pages/routes/config (ETag)
+        self._save_timer: Optional[threading.Timer] = None
+
+    def etag(self) -> str:
+        return f'W/"{_BOOT}-{self._version}"'
 
     def load_config(self, path: str = None):
+        self._last_saved_hash = b""
+        self._version += 1
         p = path or self.config_path
         if os.path.exists(p):
-            with open(p, "r", encoding="utf-8") as f:
-                self.config = yaml.safe_load(f) or {}
+            self.config = read_yaml(p)
             self.config_path = p
         else:
             self.config = {
@@ -54,18 +101,134 @@ class AppState:
                 "migration": {"dry_run": True, "download_images": True, "log_file": "migration.log"},
             }
 
+    def reset_routes(self):
+        """Route every analyzed page to skip; target/options live on the page dicts too."""
+        with self.lock:
+            self.assignments = {}
+            self.page_options = {}
+            by_slug = defaultdict(list)
+            self.wp_types = []
+            self._version += 1
+            for p in self.analyzed:
+                p["target"] = self.assignments[p["slug"]] = "skip"
+                p["options"] = {}
+                by_slug[p["slug"]].append(p)
+                self.wp_types.append(p.get("wp_type"))
+            self._by_slug = dict(by_slug)
+            self._target_counts = Counter({"skip": len(self.assignments)})
+
+    def set_target(self, slug: str, target: str):
+        with self.lock:
+            self._version += 1
+            old = self.assignments.get(slug)
+            if old is not None:
+                self._target_counts[old] -= 1
+            self.assignments[slug] = target
+            self._target_counts[target] += 1
+            for p in self._by_slug.get(slug, ()):
+                p["target"] = target
+
+    def merge_options(self, slug: str, options: dict) -> dict:
+        with self.lock:
+            self._version += 1
+            merged = self.page_options[slug] = {**self.page_options.get(slug, {}), **options}
+            for p in self._by_slug.get(slug, ()):
+                p["options"] = merged
+            return merged
+
+    def begin_migration(self):
+        with self.migration_cond:
+            self.migration_running = True
+            self.migration_log.clear()
+            self.migration_log_total = 0
+            self.migration_cond.notify_all()
+
+    def log_migration(self, msg: str):
+        with self.migration_cond:
+            self.migration_log.append(msg)
+            self.migration_log_total += 1
+            self.migration_cond.notify_all()
+
+    def migration_log_since(self, seen: int) -> list[str]:
+        """Lines appended after the first `seen` ones that are still buffered."""
+        with self.migration_cond:
+            pending = self.migration_log_total - seen
+            if pending <= 0:
+                return []
+            log = self.migration_log
+            return list(islice(log, max(0, len(log) - pending), None))
+
+    def migration_snapshot(self, seen: int) -> tuple[dict, int]:
+        """
+        Consistent {progress, log, running} view, with log lines after the first `seen`.
+        Also returns the line total to pass as `seen` next time.
+        """
+        with self.migration_cond:
+            return {
+                "progress": dict(self.migration_progress),  # copied: the runner adds keys while we serialize
+                "log": self.migration_log_since(seen),
+                "running": self.migration_running,
+            }, self.migration_log_total
+
+    def end_migration(self):
+        with self.migration_cond:
+            self.migration_running = False
+            self.migration_cond.notify_all()
+
     def save_config(self):
+        with self.lock:
+            if self._save_timer is not None:  # this write covers any pending delayed save
+                self._save_timer.cancel()
+                self._save_timer = None
+            self._save_config()
+
+    def schedule_save(self, delay: float = SAVE_DEBOUNCE):
+        """Save after `delay` seconds; a burst of edits collapses into one write."""
+        with self.lock:
+            self._version += 1  # in-memory config already changed
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(delay, self.save_config)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush_save(self):
+        """Write now if a delayed save is pending."""
+        with self.lock:
+            if self._save_timer is not None:
+                self.save_config()
+
+    def _save_config(self):
         # Group by target and options to create fine-grained rules
-        from collections import defaultdict
         rules = []
 
-        # Group CMS pages by category ID
+        # Single pass over the assignments: bucket every slug by target
         cms_by_cat: dict[int, list[str]] = defaultdict(list)
+        product_map = []
+        product_by_ref = []
+        product_by_name = []
+        skip_slugs = []
+        default_cat_id = (self.config.get("prestashop") or _EMPTY).get("cms_category_id", 1)
         for slug, target in self.assignments.items():
+            if target == "skip":
+                skip_slugs.append(slug)
+                continue
+            opts = self.page_options.get(slug, {})
             if target == "cms":
-                opts = self.page_options.get(slug, {})
-                cat_id = opts.get("cms_category_id") or self.config.get("prestashop", {}).get("cms_category_id", 1)
+                cat_id = opts.get("cms_category_id") or default_cat_id
                 cms_by_cat[cat_id].append(slug)
+            elif target == "product":
+                # Direct ID mappings vs match-by-name/reference
+                if opts.get("product_id"):
+                    product_map.append({"slug": slug, "product_id": opts["product_id"]})
+                elif opts.get("product_reference"):
+                    product_by_ref.append({"slug": slug, "product_reference": opts["product_reference"]})
+                else:
+                    match = opts.get("match_by", "name")
+                    if match == "reference":
+                        product_by_ref.append({"slug": slug})
+                    else:
+                        product_by_name.append(slug)
 
         for cat_id, slugs in sorted(cms_by_cat.items()):
             rules.append({
@@ -75,30 +238,11 @@ class AppState:
                 "slugs": sorted(slugs),
             })
 
-        # Group Product pages: direct ID mappings vs match-by-name/reference
-        product_map = []
-        product_by_ref = []
-        product_by_name = []
-        for slug, target in self.assignments.items():
-            if target != "product":
-                continue
-            opts = self.page_options.get(slug, {})
-            if opts.get("product_id"):
-                product_map.append({"slug": slug, "product_id": opts["product_id"]})
-            elif opts.get("product_reference"):
-                product_by_ref.append({"slug": slug, "product_reference": opts["product_reference"]})
-            else:
-                match = opts.get("match_by", "name")
-                if match == "reference":
-                    product_by_ref.append({"slug": slug})
-                else:
-                    product_by_name.append(slug)
-
         if product_map:
             rules.append({
                 "name": "products_by_id",
                 "target": "product",
-                "product_map": [{"slug": p["slug"], "product_id": p["product_id"]} for p in sorted(product_map, key=lambda x: x["slug"])],
+                "product_map": sorted(product_map, key=itemgetter("slug")),
             })
         if product_by_ref:
             rules.append({
@@ -116,14 +260,22 @@ class AppState:
             })
 
         # Skip rules
-        skip_slugs = sorted(s for s, t in self.assignments.items() if t == "skip")
         if skip_slugs:
+            skip_slugs.sort()
             rules.append({"name": "skipped", "target": "skip", "slugs": skip_slugs})
 
         self.config["mapping"] = {"default": "skip", "rules": rules}
 
-        with open(self.config_path, "w", encoding="utf-8") as f:
-            yaml.dump(self.config, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        # Skip the YAML emitter and the disk write when nothing changed since the last save
+        try:
+            digest = hashlib.blake2b(_json_dumps(self.config)).digest()
+        except TypeError:
+            digest = b""
+        if digest and digest == self._last_saved_hash:
+            return
+        write_yaml(self.config_path, self.config)
+        self._last_saved_hash = digest
+        self._version += 1
 
 
 STATE = AppState()
@@ -131,6 +283,22 @@ STATE = AppState()
 
 # ── WordPress scanner ────────────────────────────────────────────
 
+_FETCH_WORKERS = 8
+
+# Shared keep-alive session for every scan / connection-test request
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "User-Agent": "WP2Presta-Migration/1.0",
+    "Accept-Encoding": "gzip, deflate",
+})
+# Transient gateway errors are retried; the final response still goes through raise_for_status()
+_ADAPTER = HTTPAdapter(
+    pool_connections=4, pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504], raise_on_status=False),
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
 # Spam category keywords to auto-filter
 SPAM_KEYWORDS = [
     "casino", "1win", "1xbet", "aviator", "plinko", "bet", "poker",
@@ -139,78 +307,152 @@ SPAM_KEYWORDS = [
     "king-johnnie", "vovan", "ozwin", "maribet", "b1bet", "bbrbet",
     "888starz", "22bet", "casibom", "book-of-ra",
 ]
+# One C-level scan instead of a Python `in` test per keyword
+_SPAM_RE = re.compile("|".join(map(re.escape, SPAM_KEYWORDS)))
+
+# Patterns used by analyze_page / auto_categorize, compiled once
+_IMG_RE = re.compile(r'<img[^>]+src=["\']([^"\']+)["\']', re.I)
+_TAG_RE = re.compile(r'<[^>]+>')
+_CF7_RE = re.compile(r'wpcf7|contact-form', re.I)
+_SHORTCODE_RE = re.compile(r'\[/?[a-z_]+')
+_DIVI_RE = re.compile(r'et_pb_', re.I)
+_SLUG_RE = re.compile(r'^[a-z]+-[a-z]+(-\d+)?$')
+
+# Listing pages that have no equivalent in PrestaShop
+_SKIP_SLUGS = frozenset({"sellettes", "accessoires", "saks", "produits", "kockpits",
+                         "kontainers", "produits-stoppes", "vetements", "parachutes"})
+# Editorial pages that map to CMS pages
+_CMS_SLUGS = frozenset({"valeurs", "garantie", "recrutement", "contact", "evenements",
+                        "news", "recits", "team", "confidentialite", "documents-securite"})
+# Valid routing targets accepted by the /api/pages/* endpoints
+_TARGETS = frozenset({"cms", "product", "skip"})
+
+_PREVIEW_LEN = 300
+_EMPTY: dict = {}  # shared read-only default for missing nested objects
+_PARALLEL_ANALYZE_MIN = 100  # below this, process startup costs more than it saves
 
 
 def _fetch_wp_categories(api_base: str) -> dict[int, str]:
-    """Fetch all WP categories and return {id: name} mapping."""
+    """
+    Fetch all WP categories and return {id: name} mapping.
+    Like _fetch_all_items, pages 2..N are fetched concurrently once page 1 gives the total;
+    a failing page ends the listing there, keeping the categories read so far.
+    """
+    def fetch(page_num: int) -> requests.Response:
+        resp = _SESSION.get(
+            f"{api_base}/categories",
+            params={"per_page": 100, "page": page_num, "_fields": "id,name",
+                    "orderby": "id", "order": "asc"},
+            timeout=15,
+        )
+        resp.raise_for_status()
+        return resp
+
     cats = {}
-    page_num = 1
-    while True:
-        try:
-            resp = requests.get(
-                f"{api_base}/categories",
-                params={"per_page": 100, "page": page_num, "_fields": "id,name,slug,count"},
-                timeout=15,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            if not data:
-                break
-            for c in data:
-                cats[c["id"]] = c.get("name", c.get("slug", ""))
-            if page_num >= int(resp.headers.get("X-WP-TotalPages", 1)):
-                break
-            page_num += 1
-        except Exception:
-            break
+
+    def add(resp: requests.Response) -> bool:
+        data = resp.json()
+        for c in data:
+            cats[c["id"]] = c.get("name", "")
+        return bool(data)
+
+    try:
+        resp = fetch(1)
+        if not add(resp):
+            return cats
+        total_pages = int(resp.headers.get("X-WP-TotalPages", 1))
+        if total_pages > 1:
+            with ThreadPoolExecutor(max_workers=min(_FETCH_WORKERS, total_pages - 1)) as pool:
+                for resp in pool.map(fetch, range(2, total_pages + 1)):
+                    if not add(resp):
+                        break
+    except Exception:
+        pass
     return cats
 
 
 def _is_spam(slug: str, title: str) -> bool:
     """Check if a post looks like spam based on slug/title."""
     text = (slug + " " + title).lower()
-    return any(kw in text for kw in SPAM_KEYWORDS)
-
-
-def _fetch_all_items(api_base: str, endpoint: str, wp_type: str) -> list[dict]:
-    """Generic paginated WP REST API fetcher."""
-    all_items = []
-    page_num = 1
-    fields = "id,title,content,excerpt,slug,date,modified,featured_media,yoast_head_json"
-    if endpoint == "posts":
-        fields += ",categories"
-
-    while True:
+    return _SPAM_RE.search(text) is not None
+
+
+def _fetch_all_items(api_base: str, endpoint: str, wp_type: str,
+                     fields: str = None, extra_params: dict = None) -> list[dict]:
+    """
+    Generic paginated WP REST API fetcher.
+    Page 1 reveals X-WP-TotalPages; the remaining pages are fetched concurrently.
+    """
+    url = f"{api_base}/{endpoint}"
+    if fields is None:
+        fields = "id,title,content,excerpt,slug,date,modified,featured_media,yoast_head_json"
+        if endpoint == "posts":
+            fields += ",categories"
+
+    def fetch(page_num: int) -> requests.Response:
         params = {
             "per_page": 100, "page": page_num, "status": "publish",
             "_fields": fields,
+            **(extra_params or {}),
         }
-        resp = requests.get(f"{api_base}/{endpoint}", params=params, timeout=30)
+        resp = _SESSION.get(url, params=params, timeout=30)
         resp.raise_for_status()
-        items = resp.json()
-        if not items:
-            break
-        for item in items:
-            item["_wp_type"] = wp_type
-        all_items.extend(items)
-        total_pages = int(resp.headers.get("X-WP-TotalPages", 1))
-        if page_num >= total_pages:
-            break
-        page_num += 1
-
+        return resp
+
+    resp = fetch(1)
+    all_items = resp.json()
+    total_pages = int(resp.headers.get("X-WP-TotalPages", 1))
+    if all_items and total_pages > 1:
+        workers = min(_FETCH_WORKERS, total_pages - 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # map() yields in submission order, so item order is preserved
+            for resp in pool.map(fetch, range(2, total_pages + 1)):
+                all_items.extend(resp.json())
+
+    for item in all_items:
+        item["_wp_type"] = wp_type
     return all_items
 
 
-def scan_wordpress(wp_url: str) -> tuple[list[dict], dict[int, str]]:
-    """Fetch all published pages AND posts. Returns (items, categories)."""
+def _refresh_items(api_base: str, endpoint: str, wp_type: str,
+                   cached_items: list[dict], since: str) -> list[dict]:
+    """
+    Incremental fetch: only items modified after `since` are downloaded in full.
+    A light id-only listing drops deleted/unpublished items and keeps WP's ordering.
+    Listed ids the cache has never seen (scheduled posts going live, drafts or private
+    pages published since) keep their old `modified`, so they are fetched by id.
+    """
+    ids = [it["id"] for it in _fetch_all_items(api_base, endpoint, wp_type, fields="id")]
+    by_id = {it["id"]: it for it in cached_items if it.get("_wp_type") == wp_type}
+    for it in _fetch_all_items(api_base, endpoint, wp_type, extra_params={"modified_after": since}):
+        by_id[it["id"]] = it
+    missing = [i for i in ids if i not in by_id]
+    for start in range(0, len(missing), 100):  # include= takes at most per_page ids
+        chunk = ",".join(map(str, missing[start:start + 100]))
+        for it in _fetch_all_items(api_base, endpoint, wp_type, extra_params={"include": chunk}):
+            by_id[it["id"]] = it
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def scan_wordpress(wp_url: str, cache: Optional[dict] = None) -> tuple[list[dict], dict[int, str]]:
+    """
+    Fetch all published pages AND posts. Returns (items, categories).
+    With a previous scan of the same site (`cache`), unchanged items are reused.
+    """
     api_base = wp_url.rstrip("/") + "/wp-json/wp/v2"
 
     # Fetch categories first
     categories = _fetch_wp_categories(api_base)
 
     # Fetch pages + posts
-    pages = _fetch_all_items(api_base, "pages", "page")
-    posts = _fetch_all_items(api_base, "posts", "post")
+    since = cache.get("modified") if cache else ""
+    if since:
+        cached_items = cache.get("items", [])
+        pages = _refresh_items(api_base, "pages", "page", cached_items, since)
+        posts = _refresh_items(api_base, "posts", "post", cached_items, since)
+    else:
+        pages = _fetch_all_items(api_base, "pages", "page")
+        posts = _fetch_all_items(api_base, "posts", "post")
 
     # Filter out spam posts
     clean_posts = []
@@ -229,26 +471,42 @@ def scan_wordpress(wp_url: str) -> tuple[list[dict], dict[int, str]]:
     return pages + clean_posts, categories
 
 
+def _text_preview(content_html: str, limit: int = _PREVIEW_LEN) -> str:
+    """
+    Plain-text preview of an HTML body.
+    Only the shortest prefix (cut just after a '>') that yields `limit`
+    characters is stripped, so large pages are not walked end to end.
+    """
+    window = limit * 4
+    while True:
+        cut = content_html.find(">", window) + 1
+        chunk = content_html[:cut] if cut else content_html
+        # str.split() collapses the same whitespace as \s+, without a second regex pass
+        text = " ".join(_TAG_RE.sub(" ", chunk).split())
+        text = html.unescape(text)
+        if not cut or len(text) >= limit:
+            return text[:limit]
+        window *= 4
+
+
 def analyze_page(page: dict) -> dict:
-    title = html.unescape(page.get("title", {}).get("rendered", "(sans titre)"))
-    content_html = page.get("content", {}).get("rendered", "")
+    title = html.unescape((page.get("title") or _EMPTY).get("rendered", "(sans titre)"))
+    content_html = (page.get("content") or _EMPTY).get("rendered", "")
     slug = page.get("slug", "")
-    yoast = page.get("yoast_head_json", {}) or {}
-    images = re.findall(r'<img[^>]+src=["\']([^"\']+)["\']', content_html, re.I)
-    size = len(content_html.encode("utf-8"))
+    yoast = page.get("yoast_head_json") or _EMPTY
+    images = _IMG_RE.findall(content_html)
+    # ASCII bodies are 1 byte per char: skip allocating a UTF-8 copy just to measure it
+    size = len(content_html) if content_html.isascii() else len(content_html.encode("utf-8"))
 
-    # Text preview
-    text = re.sub(r'<[^>]+>', ' ', content_html)
-    text = re.sub(r'\s+', ' ', text).strip()
-    text = html.unescape(text)[:300]
+    text = _text_preview(content_html)
 
     # Warnings
     warnings = []
-    if re.search(r'wpcf7|contact-form', content_html, re.I):
+    if _CF7_RE.search(content_html):
         warnings.append("Formulaire CF7")
-    if re.search(r'\[/?[a-z_]+', content_html):
+    if _SHORTCODE_RE.search(content_html):
         warnings.append("Shortcodes")
-    if re.search(r'et_pb_', content_html, re.I):
+    if _DIVI_RE.search(content_html):
         warnings.append("Divi builder")
 
     # Size human
@@ -283,6 +541,106 @@ def analyze_page(page: dict) -> dict:
     }
 
 
+# One pool for the whole session. Scans run on request threads, so the workers must not
+# be forked from this multi-threaded process: forkserver (spawn where unavailable) starts
+# them from a clean single-threaded parent.
+_analyze_pool: Optional[ProcessPoolExecutor] = None
+_analyze_pool_lock = threading.Lock()
+
+
+def _get_analyze_pool() -> ProcessPoolExecutor:
+    global _analyze_pool
+    with _analyze_pool_lock:
+        if _analyze_pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _analyze_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context(method))
+        return _analyze_pool
+
+
+def _drop_analyze_pool():
+    global _analyze_pool
+    with _analyze_pool_lock:
+        pool, _analyze_pool = _analyze_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def analyze_pages(pages: list[dict]) -> list[dict]:
+    """Analyze every page, spreading large scans over worker processes."""
+    if len(pages) < _PARALLEL_ANALYZE_MIN or (os.cpu_count() or 1) < 2:
+        return [analyze_page(p) for p in pages]
+    try:
+        return list(_get_analyze_pool().map(analyze_page, pages, chunksize=32))
+    except (BrokenProcessPool, OSError) as e:
+        _drop_analyze_pool()  # the next scan starts a fresh pool
+        logger.warning(f"Analyse parallèle indisponible ({e}), analyse séquentielle")
+        return [analyze_page(p) for p in pages]
+
+
+# ── Scan cache ───────────────────────────────────────────────────
+# Raw items + their analysis from the last scan, so a re-scan only
+# downloads and analyzes what changed on the WordPress side.
+
+SCAN_CACHE_PATH = ".wp_scan_cache.json"
+_ANALYZE_VERSION = 1  # bump when analyze_page output changes, to invalidate cached analyses
+
+
+def _load_scan_cache(wp_url: str) -> Optional[dict]:
+    try:
+        with open(SCAN_CACHE_PATH, "rb") as f:
+            cache = _json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+    return cache if isinstance(cache, dict) and cache.get("url") == wp_url else None
+
+
+def _save_scan_cache(wp_url: str, items: list[dict], analyzed: list[dict]):
+    cache = {
+        "url": wp_url,
+        "modified": max((it.get("modified", "") for it in items), default=""),
+        "analyze_version": _ANALYZE_VERSION,
+        "items": items,
+        "analyzed": analyzed,
+    }
+    try:
+        with open(SCAN_CACHE_PATH, "wb") as f:
+            f.write(_json_dumps(cache))
+    except (OSError, TypeError) as e:
+        logger.warning(f"Cache de scan non écrit: {e}")
+
+
+def scan_and_analyze(wp_url: str, incremental: bool = True) -> tuple[list[dict], list[dict], dict[int, str]]:
+    """
+    Scan WordPress and analyze every item.
+    Analyses are reused for items whose (type, id, modified) is unchanged, even on a full
+    re-download (`incremental=False`), so only new or edited items hit the regex work.
+    """
+    cache = _load_scan_cache(wp_url)
+    items, categories = scan_wordpress(wp_url, cache if incremental else None)
+
+    # (wp_type, id) → (modified, analysis) from the previous scan
+    previous = {}
+    if cache and cache.get("analyze_version") == _ANALYZE_VERSION:
+        modified = {(it.get("_wp_type"), it.get("id")): it.get("modified") for it in cache.get("items", [])}
+        for a in cache.get("analyzed", []):
+            key = (a.get("wp_type"), a.get("wp_id"))
+            previous[key] = (modified.get(key), a)
+
+    analyzed: list[Optional[dict]] = [None] * len(items)
+    stale = []
+    for i, it in enumerate(items):
+        hit = previous.get((it.get("_wp_type", "page"), it.get("id", 0)))
+        if hit is not None and hit[0] == it.get("modified"):
+            analyzed[i] = hit[1]
+        else:
+            stale.append(i)
+    for i, a in zip(stale, analyze_pages([items[i] for i in stale])):
+        analyzed[i] = a
+
+    _save_scan_cache(wp_url, items, analyzed)
+    return items, analyzed, categories
+
+
 def auto_categorize(page: dict, categories: dict[int, str] = None) -> str:
     slug = page["slug"]
     title = page["title"]
@@ -299,9 +657,8 @@ def auto_categorize(page: dict, categories: dict[int, str] = None) -> str:
     # Posts (articles) → default to CMS unless spam
     if wp_type == "post":
         # Check if spam by category name
-        for cn in cat_names:
-            if any(kw in cn for kw in SPAM_KEYWORDS):
-                return "skip"
+        if any(_SPAM_RE.search(cn) for cn in cat_names):
+            return "skip"
         return "cms"  # All legit posts → CMS by default
 
     # Pages: product-like (many images + large content)
@@ -309,38 +666,92 @@ def auto_categorize(page: dict, categories: dict[int, str] = None) -> str:
         return "product"
 
     # Pages: index/listing pages
-    if slug in ("sellettes", "accessoires", "saks", "produits", "kockpits",
-                "kontainers", "produits-stoppes", "vetements", "parachutes"):
+    if slug in _SKIP_SLUGS:
         return "skip"
 
     # Pages: ambassador profiles (First Last pattern)
-    if re.match(r'^[a-z]+-[a-z]+(-\d+)?$', slug):
+    if _SLUG_RE.match(slug):
         words = title.split()
         if len(words) >= 2 and all(w[0:1].isupper() for w in words if w):
             return "cms"
 
     # Pages: known content pages
-    content_slugs = ["valeurs", "garantie", "recrutement", "contact", "evenements",
-                     "news", "recits", "team", "confidentialite", "documents-securite"]
-    if slug in content_slugs:
+    if slug in _CMS_SLUGS:
         return "cms"
 
     return "skip"
 
 
+# ── Connection probes ────────────────────────────────────────────
+
+def _connection_params(body: dict) -> tuple[str, str, str]:
+    """(wp_url, ps_url, ps_key) from the request, else the config; stored back so they persist."""
+    with STATE.lock:  # the delayed save may be serializing the config right now
+        wp_cfg = STATE.config.get("wordpress") or _EMPTY
+        ps_cfg = STATE.config.get("prestashop") or _EMPTY
+        wp_url = body.get("wp_url") or wp_cfg.get("url", "")
+        ps_url = body.get("ps_url") or ps_cfg.get("url", "")
+        ps_key = body.get("ps_key") or ps_cfg.get("api_key", "")
+
+        # Auto-add https:// if missing
+        if wp_url and not wp_url.startswith(("http://", "https://")):
+            wp_url = "https://" + wp_url
+        if ps_url and not ps_url.startswith(("http://", "https://")):
+            ps_url = "https://" + ps_url
+
+        if wp_url:
+            STATE.config.setdefault("wordpress", {})["url"] = wp_url
+        if ps_url:
+            STATE.config.setdefault("prestashop", {})["url"] = ps_url
+        if ps_key:
+            STATE.config.setdefault("prestashop", {})["api_key"] = ps_key
+    return wp_url, ps_url, ps_key
+
+
+def _probe_wp(wp_url: str) -> tuple[bool, str]:
+    """(reachable, error message) for the WordPress REST API."""
+    if not wp_url:
+        return False, "URL WordPress non configurée"
+    try:
+        r = _SESSION.get(wp_url.rstrip("/") + "/wp-json/wp/v2/pages?per_page=1", timeout=10)
+        r.raise_for_status()
+        return True, ""
+    except Exception as e:
+        return False, str(e)
+
+
+def _probe_ps(ps_url: str, ps_key: str) -> tuple[bool, str]:
+    """(reachable, error message) for the PrestaShop webservice."""
+    if not ps_url:
+        return False, "URL PrestaShop non configurée"
+    if not ps_key:
+        return False, "Clé API PrestaShop non configurée"
+    try:
+        r = _SESSION.get(
+            ps_url.rstrip("/") + "/api/",
+            auth=(ps_key, ""), timeout=10,
+            verify=False,
+        )
+        if r.status_code == 200:
+            return True, ""
+        return False, f"HTTP {r.status_code}"
+    except Exception as e:
+        return False, str(e)
+
+
 # ── Migration runner ─────────────────────────────────────────────
 
 def run_migration_thread(dry_run: bool):
-    STATE.migration_running = True
-    STATE.migration_log = []
+    # STATE.begin_migration() has already been called by the /api/migrate handler
 
     # Only migrate items explicitly assigned to cms or product
     items_to_migrate = []
-    for p in STATE.wp_pages:
-        slug = p.get("slug", "")
-        target = STATE.assignments.get(slug, "skip")
-        if target in ("cms", "product"):
-            items_to_migrate.append((p, slug, target))
+    with STATE.lock:
+        for p in STATE.wp_pages:
+            slug = p.get("slug", "")
+            target = STATE.assignments.get(slug, "skip")
+            if target in ("cms", "product"):
+                items_to_migrate.append((p, slug, target))
 
     STATE.migration_progress = {
         "current": 0,
@@ -349,16 +760,17 @@ def run_migration_thread(dry_run: bool):
     }
 
     if not items_to_migrate:
-        STATE.migration_log.append("⚠️ Aucun élément assigné à CMS ou Produit — rien à migrer.")
-        STATE.migration_log.append("Utilisez le Scanner pour assigner des pages avant de lancer la migration.")
+        STATE.log_migration("⚠️ Aucun élément assigné à CMS ou Produit — rien à migrer.")
+        STATE.log_migration("Utilisez le Scanner pour assigner des pages avant de lancer la migration.")
         STATE.migration_progress["status"] = "done"
         STATE.migration_progress["stats"] = {
             "cms_migrated": 0, "product_updated": 0,
             "skipped": 0, "failed": 0, "images": 0,
         }
-        STATE.migration_running = False
+        STATE.end_migration()
         return
 
+    gui_handler = None
     try:
         from .config import load_config
         from .migrator import Migrator
@@ -374,8 +786,11 @@ def run_migration_thread(dry_run: bool):
         # Patch logger to capture output for the GUI
         class _GUILogHandler(logging.Handler):
             def emit(self, record):
-                msg = self.format(record)
-                STATE.migration_log.append(msg)
+                # The formatter is plain '%(message)s': skip it unless there is a traceback to render
+                if record.exc_info or record.stack_info:
+                    STATE.log_migration(self.format(record))
+                else:
+                    STATE.log_migration(record.getMessage())
 
         gui_handler = _GUILogHandler()
         gui_handler.setFormatter(logging.Formatter('%(message)s'))
@@ -455,63 +870,177 @@ def run_migration_thread(dry_run: bool):
         STATE.migration_progress["status"] = "done"
         STATE.migration_progress["stats"] = migrator.stats
     except Exception as e:
-        STATE.migration_log.append(f"❌ Erreur fatale: {e}")
+        STATE.log_migration(f"❌ Erreur fatale: {e}")
         STATE.migration_progress["status"] = "error"
         STATE.migration_progress["error"] = str(e)
     finally:
-        STATE.migration_running = False
+        if gui_handler is not None:
+            logging.getLogger("wp2presta").removeHandler(gui_handler)
+        STATE.end_migration()
 
 
 
 # ── HTTP Handler ─────────────────────────────────────────────────
 
+_BODY_READINTO_MIN = 4096  # smaller request bodies are read in a single call
+_GZIP_MIN = 1024           # smaller JSON responses are not worth compressing
+
+# Versioned GET responses: key → [etag, JSON bytes, gzip bytes or None]
+_RESPONSE_CACHE: dict[str, list] = {}
+
+# The SPA is static: gui_assets encodes and compresses it once at import.
+# All variants go to one file (offsets by encoding) so os.sendfile() can hand them
+# to the socket without a userspace copy.
+_HTML_FILE = None
+_HTML_OFFSETS: dict[str | None, int] = {}
+if hasattr(os, "sendfile"):
+    try:
+        _HTML_FILE = tempfile.TemporaryFile()
+        for encoding, body in HTML_VARIANTS:
+            _HTML_OFFSETS[encoding] = _HTML_FILE.tell()
+            _HTML_FILE.write(body)
+        _HTML_FILE.flush()
+    except OSError:
+        _HTML_FILE = None
+
+
+def _asset_headers(content_type: str, cache_control: str, body: bytes, encoding: str | None,
+                   extra: str = "") -> bytes:
+    """Headers after Server/Date of a static asset response, built once per encoding."""
+    head = f"Content-Type: {content_type}\r\nCache-Control: {cache_control}\r\n{extra}Vary: Accept-Encoding\r\n"
+    if encoding:
+        head += f"Content-Encoding: {encoding}\r\n"
+    return (head + f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1")
+
+
+_HTML_HEADERS = {
+    encoding: _asset_headers(
+        "text/html; charset=utf-8", "no-cache, must-revalidate", body, encoding,
+        f"ETag: {HTML_ETAGS[encoding]}\r\nLink: <{CSS_PATH}>; rel=preload; as=style\r\n",
+    )
+    for encoding, body in HTML_VARIANTS
+}
+# The CSS URL carries the content hash, so a response never goes stale
+_CSS_HEADERS = {
+    encoding: _asset_headers("text/css; charset=utf-8", "public, max-age=31536000, immutable", body, encoding)
+    for encoding, body in CSS_VARIANTS
+}
+
+
 class GUIHandler(BaseHTTPRequestHandler):
+    # Keep-alive: the page, its stylesheet and the API calls share one connection.
+    # Every response therefore carries a Content-Length, except the SSE stream which closes.
+    protocol_version = "HTTP/1.1"
+
     def log_message(self, format, *args):
         pass  # Silence HTTP logs
 
+    def _send_cached_json(self, key: str, get_data):
+        """
+        Answer 304 when the client already holds the current STATE version; otherwise
+        reuse the body encoded for this version (and its gzip) across requests.
+        """
+        gz = accepts_encoding(self.headers.get("Accept-Encoding", ""), "gzip")
+        with STATE.lock:  # no mutation can slip between reading the version and encoding
+            etag = STATE.etag()
+            if self.headers.get("If-None-Match") == etag:
+                body = None
+            else:
+                cached = _RESPONSE_CACHE.get(key)
+                if cached is None or cached[0] != etag:
+                    cached = _RESPONSE_CACHE[key] = [etag, _json_dumps(get_data()), None]
+                body = cached[1]
+                if gz and len(body) >= _GZIP_MIN:
+                    if cached[2] is None:
+                        cached[2] = gzip.compress(body, compresslevel=1)
+                    body = cached[2]
+                else:
+                    gz = False
+        if body is None:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self._send_json_bytes(body, etag=etag, gzipped=gz)
+
     def _send_json(self, data: Any, status: int = 200):
-        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json; charset=utf-8")
-        self.send_header("Content-Length", str(len(body)))
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.end_headers()
-        self.wfile.write(body)
+        body = _json_dumps(data)
+        gz = len(body) >= _GZIP_MIN and accepts_encoding(self.headers.get("Accept-Encoding", ""), "gzip")
+        if gz:
+            body = gzip.compress(body, compresslevel=1)
+        self._send_json_bytes(body, status, gzipped=gz)
+
+    def _status_head(self, status: int) -> str:
+        return (
+            f"{self.protocol_version} {status} {HTTPStatus(status).phrase}\r\n"
+            f"Server: {self.version_string()}\r\n"
+            f"Date: {self.date_time_string()}\r\n"
+        )
+
+    def _send_json_bytes(self, body: bytes, status: int = 200, etag: str = None, gzipped: bool = False):
+        extra = ""
+        if gzipped:
+            extra += "Content-Encoding: gzip\r\n"
+        if etag:
+            extra += f"ETag: {etag}\r\nCache-Control: no-cache\r\n"
+        # Status line, headers and body go out in a single write
+        head = (
+            self._status_head(status)
+            + "Content-Type: application/json; charset=utf-8\r\n"
+            + extra
+            + "Vary: Accept-Encoding\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "\r\n"
+        ).encode("latin-1")
+        self.wfile.write(head + body)
 
     def _read_body(self) -> dict:
         length = int(self.headers.get("Content-Length", 0))
-        if length:
-            return json.loads(self.rfile.read(length))
-        return {}
+        if not length:
+            return {}
+        if length < _BODY_READINTO_MIN:
+            return _json_loads(self.rfile.read(length))
+        # Large bodies (bulk routes): fill one buffer in place, tolerating short reads
+        buf = bytearray(length)
+        view = memoryview(buf)
+        n = 0
+        while n < length:
+            chunk = self.rfile.readinto(view[n:])
+            if not chunk:
+                break
+            n += chunk
+        return _json_loads(buf if n == length else buf[:n])
 
     def do_OPTIONS(self):
         self.send_response(200)
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Methods", "GET, POST, PUT, OPTIONS")
         self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self.send_header("Content-Length", "0")
         self.end_headers()
 
     def do_GET(self):
-        path = urlparse(self.path).path
+        url = urlparse(self.path)
+        path = url.path
 
         if path == "/" or path == "/index.html":
             self._serve_html()
+        elif path == CSS_PATH:
+            self._serve_css()
         elif path == "/api/config":
-            self._send_json(STATE.config)
+            self._send_cached_json(path, lambda: STATE.config)
         elif path == "/api/pages":
-            pages = []
-            for p in STATE.analyzed:
-                p_copy = dict(p)
-                p_copy["target"] = STATE.assignments.get(p["slug"], "skip")
-                p_copy["options"] = STATE.page_options.get(p["slug"], {})
-                pages.append(p_copy)
-            self._send_json(pages)
+            self._send_cached_json(path, lambda: STATE.analyzed)
+        elif path == "/api/migrate/stream":
+            self._stream_migration()
         elif path == "/api/migrate/status":
-            self._send_json({
-                "progress": STATE.migration_progress,
-                "log": STATE.migration_log[-50:],
-                "running": STATE.migration_running,
-            })
+            # ?since=N returns only the lines after the N-th (N = "log_total" of the previous poll)
+            since = parse_qs(url.query).get("since", [""])[0]
+            seen = int(since) if since.isdigit() else STATE.migration_log_total - 50
+            status, total = STATE.migration_snapshot(seen)
+            status["log_total"] = total
+            self._send_json(status)
         elif path == "/api/ps/cms-categories":
             # Auto-detect CMS categories from PrestaShop
             ps_cfg = STATE.config.get("prestashop", {})
@@ -549,95 +1078,66 @@ class GUIHandler(BaseHTTPRequestHandler):
         body = self._read_body()
 
         if path == "/api/config":
-            STATE.config.update(body)
-            STATE.save_config()
+            with STATE.lock:
+                STATE.config.update(body)
+                STATE.schedule_save()
             self._send_json({"ok": True})
 
         elif path == "/api/test-connection":
             result = {"wordpress": False, "prestashop": False, "wp_error": "", "ps_error": ""}
-            wp_url = body.get("wp_url") or STATE.config.get("wordpress", {}).get("url", "")
-            ps_url = body.get("ps_url") or STATE.config.get("prestashop", {}).get("url", "")
-            ps_key = body.get("ps_key") or STATE.config.get("prestashop", {}).get("api_key", "")
-
-            # Auto-add https:// if missing
-            if wp_url and not wp_url.startswith(("http://", "https://")):
-                wp_url = "https://" + wp_url
-            if ps_url and not ps_url.startswith(("http://", "https://")):
-                ps_url = "https://" + ps_url
-
-            # Save URLs into config so they persist
-            if wp_url:
-                STATE.config.setdefault("wordpress", {})["url"] = wp_url
-            if ps_url:
-                STATE.config.setdefault("prestashop", {})["url"] = ps_url
-            if ps_key:
-                STATE.config.setdefault("prestashop", {})["api_key"] = ps_key
-
-            if wp_url:
-                try:
-                    r = requests.get(wp_url.rstrip("/") + "/wp-json/wp/v2/pages?per_page=1", timeout=10)
-                    r.raise_for_status()
-                    result["wordpress"] = True
-                except Exception as e:
-                    result["wp_error"] = str(e)
-            else:
-                result["wp_error"] = "URL WordPress non configurée"
+            wp_url, ps_url, ps_key = _connection_params(body)
 
-            if ps_url and ps_key:
-                try:
-                    r = requests.get(
-                        ps_url.rstrip("/") + "/api/",
-                        auth=(ps_key, ""), timeout=10,
-                        verify=False,
-                    )
-                    result["prestashop"] = r.status_code == 200
-                    if not result["prestashop"]:
-                        result["ps_error"] = f"HTTP {r.status_code}"
-                except Exception as e:
-                    result["ps_error"] = str(e)
-            elif not ps_url:
-                result["ps_error"] = "URL PrestaShop non configurée"
-            elif not ps_key:
-                result["ps_error"] = "Clé API PrestaShop non configurée"
+            # Both probes are independent: run them side by side
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                wp_probe = pool.submit(_probe_wp, wp_url)
+                ps_probe = pool.submit(_probe_ps, ps_url, ps_key)
+                result["wordpress"], result["wp_error"] = wp_probe.result()
+                result["prestashop"], result["ps_error"] = ps_probe.result()
 
-            STATE.save_config()
+            STATE.schedule_save()
             self._send_json(result)
 
+        elif path in ("/api/test-wp", "/api/test-ps"):
+            # One side of /api/test-connection, so the GUI can show each result as it lands
+            wp_url, ps_url, ps_key = _connection_params(body)
+            ok, error = _probe_wp(wp_url) if path == "/api/test-wp" else _probe_ps(ps_url, ps_key)
+            STATE.schedule_save()
+            self._send_json({"ok": ok, "error": error})
+
         elif path == "/api/scan":
-            wp_url = body.get("url") or STATE.config.get("wordpress", {}).get("url", "")
+            wp_url = body.get("url") or (STATE.config.get("wordpress") or _EMPTY).get("url", "")
             if not wp_url:
                 self._send_json({"error": "URL WordPress requise"}, 400)
                 return
 
             try:
-                STATE.wp_pages, wp_categories = scan_wordpress(wp_url)
-                STATE.analyzed = [analyze_page(p) for p in STATE.wp_pages]
-                STATE.analyzed.sort(key=lambda p: p["slug"])
+                wp_pages, analyzed, wp_categories = scan_and_analyze(
+                    wp_url, incremental=not body.get("full"))
+                analyzed.sort(key=lambda p: p["slug"])
 
                 # Resolve category names and store for later use
-                STATE._wp_categories = wp_categories
-                for item in STATE.analyzed:
+                for item in analyzed:
                     item["category_names"] = [
                         wp_categories.get(c, "?") for c in item.get("wp_categories", [])
                     ]
 
-                # Default: everything set to "skip" — user assigns explicitly
-                # or uses the 🤖 Auto button to auto-categorize
-                STATE.assignments = {}
-                STATE.page_options = {}
-                for p in STATE.analyzed:
-                    STATE.assignments[p["slug"]] = "skip"
+                with STATE.lock:
+                    STATE.wp_pages, STATE.analyzed = wp_pages, analyzed
+                    STATE._wp_categories = wp_categories
 
-                page_count = sum(1 for p in STATE.analyzed if p.get("wp_type") == "page")
-                post_count = sum(1 for p in STATE.analyzed if p.get("wp_type") == "post")
+                    # Default: everything set to "skip" — user assigns explicitly
+                    # or uses the 🤖 Auto button to auto-categorize
+                    STATE.reset_routes()
 
+                    type_counts = Counter(STATE.wp_types)
+                    counts = STATE._target_counts
                 self._send_json({
                     "total": len(STATE.analyzed),
-                    "pages": page_count,
-                    "posts": post_count,
-                    "cms": sum(1 for t in STATE.assignments.values() if t == "cms"),
-                    "product": sum(1 for t in STATE.assignments.values() if t == "product"),
-                    "skip": sum(1 for t in STATE.assignments.values() if t == "skip"),
+                    "pages": type_counts["page"],
+                    "posts": type_counts["post"],
+                    "cms": counts["cms"],
+                    "product": counts["product"],
+                    "skip": counts["skip"],
                 })
             except Exception as e:
                 self._send_json({"error": str(e)}, 500)
@@ -646,23 +1146,36 @@ class GUIHandler(BaseHTTPRequestHandler):
             slug = body.get("slug", "")
             target = body.get("target", "skip")
             options = body.get("options", {})
-            if slug and target in ("cms", "product", "skip"):
-                STATE.assignments[slug] = target
+            if slug and target in _TARGETS:
+                STATE.set_target(slug, target)
                 if options:
-                    STATE.page_options[slug] = {**STATE.page_options.get(slug, {}), **options}
+                    STATE.merge_options(slug, options)
                 self._send_json({"ok": True})
             else:
                 self._send_json({"error": "Invalid slug or target"}, 400)
 
         elif path == "/api/pages/bulk-route":
+            # Either {slugs, target, options} or {routes: {slug: target}} for mixed destinations
+            routes = body.get("routes")
+            if routes is not None:
+                if isinstance(routes, dict) and all(t in _TARGETS for t in routes.values()):
+                    with STATE.lock:
+                        for slug, target in routes.items():
+                            STATE.set_target(slug, target)
+                    self._send_json({"ok": True, "count": len(routes)})
+                else:
+                    self._send_json({"error": "Invalid target"}, 400)
+                return
+
             slugs = body.get("slugs", [])
             target = body.get("target", "skip")
             options = body.get("options", {})
-            if target in ("cms", "product", "skip"):
-                for slug in slugs:
-                    STATE.assignments[slug] = target
-                    if options:
-                        STATE.page_options[slug] = {**STATE.page_options.get(slug, {}), **options}
+            if target in _TARGETS:
+                with STATE.lock:
+                    for slug in slugs:
+                        STATE.set_target(slug, target)
+                        if options:
+                            STATE.merge_options(slug, options)
                 self._send_json({"ok": True, "count": len(slugs)})
             else:
                 self._send_json({"error": "Invalid target"}, 400)
@@ -671,19 +1184,24 @@ class GUIHandler(BaseHTTPRequestHandler):
             slug = body.get("slug", "")
             options = body.get("options", {})
             if slug:
-                STATE.page_options[slug] = {**STATE.page_options.get(slug, {}), **options}
-                self._send_json({"ok": True, "options": STATE.page_options[slug]})
+                self._send_json({"ok": True, "options": STATE.merge_options(slug, options)})
             else:
                 self._send_json({"error": "Slug requis"}, 400)
 
         elif path == "/api/pages/auto-categorize":
             cats = getattr(STATE, '_wp_categories', {})
-            for p in STATE.analyzed:
-                STATE.assignments[p["slug"]] = auto_categorize(p, cats)
+            routes = {}
+            with STATE.lock:
+                for p in STATE.analyzed:
+                    routes[p["slug"]] = target = auto_categorize(p, cats)
+                    STATE.set_target(p["slug"], target)
+                counts = STATE._target_counts
+            # The GUI applies the slug → target map itself instead of re-fetching /api/pages
             self._send_json({
-                "cms": sum(1 for t in STATE.assignments.values() if t == "cms"),
-                "product": sum(1 for t in STATE.assignments.values() if t == "product"),
-                "skip": sum(1 for t in STATE.assignments.values() if t == "skip"),
+                "routes": routes,
+                "cms": counts["cms"],
+                "product": counts["product"],
+                "skip": counts["skip"],
             })
 
         elif path == "/api/migrate":
@@ -692,9 +1210,11 @@ class GUIHandler(BaseHTTPRequestHandler):
                 return
 
             # Validate config before starting
-            wp_url = STATE.config.get("wordpress", {}).get("url", "")
-            ps_url = STATE.config.get("prestashop", {}).get("url", "")
-            ps_key = STATE.config.get("prestashop", {}).get("api_key", "")
+            wp_cfg = STATE.config.get("wordpress") or _EMPTY
+            ps_cfg = STATE.config.get("prestashop") or _EMPTY
+            wp_url = wp_cfg.get("url", "")
+            ps_url = ps_cfg.get("url", "")
+            ps_key = ps_cfg.get("api_key", "")
 
             if not wp_url:
                 self._send_json({"error": "❌ URL WordPress non configurée. Allez dans l'onglet Configuration."}, 400)
@@ -711,6 +1231,7 @@ class GUIHandler(BaseHTTPRequestHandler):
 
             dry_run = body.get("dry_run", True)
             STATE.save_config()
+            STATE.begin_migration()
             thread = threading.Thread(target=run_migration_thread, args=(dry_run,), daemon=True)
             thread.start()
             self._send_json({"ok": True, "dry_run": dry_run})
@@ -722,14 +1243,62 @@ class GUIHandler(BaseHTTPRequestHandler):
         else:
             self.send_error(404)
 
-    def _serve_html(self):
-        from .gui_assets import get_html
-        body = get_html().encode("utf-8")
+    def _stream_migration(self):
+        """Push progress and new log lines as Server-Sent Events until the migration ends."""
         self.send_response(200)
-        self.send_header("Content-Type", "text/html; charset=utf-8")
-        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Connection", "close")
         self.end_headers()
-        self.wfile.write(body)
+        self.close_connection = True
+
+        sent = 0
+        cond = STATE.migration_cond
+        try:
+            while True:
+                with cond:
+                    cond.wait_for(lambda: STATE.migration_log_total > sent or not STATE.migration_running, timeout=15)
+                    event, sent = STATE.migration_snapshot(sent)
+                event["log_total"] = sent
+                self.wfile.write(b"data: " + _json_dumps(event) + b"\n\n")
+                self.wfile.flush()
+                if not event["running"]:
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client went away
+
+    def _serve_html(self):
+        body, encoding = get_html_bytes(self.headers.get("Accept-Encoding", ""))
+        etag = HTML_ETAGS[encoding]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache, must-revalidate")
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return
+        self.wfile.write(self._status_head(200).encode("latin-1") + _HTML_HEADERS[encoding])
+
+        sent = 0
+        if _HTML_FILE is not None:
+            # Explicit offsets: the shared file position is never used, so threads don't race
+            offset = _HTML_OFFSETS[encoding]
+            try:
+                out_fd = self.connection.fileno()
+                while sent < len(body):
+                    n = os.sendfile(out_fd, _HTML_FILE.fileno(), offset + sent, len(body) - sent)
+                    if not n:
+                        break
+                    sent += n
+            except OSError:
+                pass
+        if sent < len(body):
+            self.wfile.write(memoryview(body)[sent:])
+
+    def _serve_css(self):
+        body, encoding = get_css_bytes(self.headers.get("Accept-Encoding", ""))
+        self.wfile.write(self._status_head(200).encode("latin-1") + _CSS_HEADERS[encoding] + body)
 
 
 # ── Main ─────────────────────────────────────────────────────────
@@ -749,10 +1318,7 @@ def main():
     import urllib3
     urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-    class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
-        daemon_threads = True
-
-    server = _ThreadingHTTPServer(("0.0.0.0", args.port), GUIHandler)
+    server = ThreadingHTTPServer(("0.0.0.0", args.port), GUIHandler)
     url = f"http://localhost:{args.port}"
 
     print(f"\n  ╔══════════════════════════════════════════════╗")
@@ -768,6 +1334,9 @@ def main():
     except KeyboardInterrupt:
         print("\n  Arrêt du serveur.")
         server.shutdown()
+    finally:
+        STATE.flush_save()
+        _drop_analyze_pool()
 
 
 if __name__ == "__main__":
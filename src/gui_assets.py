@@ -3,23 +3,28 @@ Single-page HTML/CSS/JS frontend for the migration GUI.
 Embedded as a Python string to avoid external files.
 """
 
+import gzip
+import hashlib
+import logging
+import re
+from collections import Counter
 
-def get_html() -> str:
-    return '''<!DOCTYPE html>
-<html lang="fr">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>WP → PrestaShop Migration</title>
-<link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
-<style>
-/* ── Reset & Base ──────────────────────────────────────────── */
+# Brotli beats gzip by 15-25% on HTML/CSS; gzip alone is the fallback
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger("wp2presta.gui")
+
+_CSS = '''/* ── Reset & Base ──────────────────────────────────────────── */
 *, *::before, *::after { margin: 0; padding: 0; box-sizing: border-box; }
 :root {
     --bg-deep: #0a0a1a;
     --bg-card: rgba(18, 18, 42, 0.85);
     --bg-card-hover: rgba(25, 25, 55, 0.95);
     --bg-input: rgba(30, 30, 65, 0.9);
+    --bg-panel: rgba(12, 12, 30, 0.97);
     --border: rgba(100, 100, 180, 0.15);
     --border-active: rgba(102, 126, 234, 0.5);
     --accent: #667eea;
@@ -35,35 +40,42 @@ def get_html() -> str:
     --radius: 12px;
     --radius-sm: 8px;
     --glass: blur(20px);
+    --shadow-btn: 0 4px 15px;
+}
+/* Theme switch: only the palette changes, every rule reads it through var() */
+[data-theme="light"] {
+    --bg-deep: #f5f5fa;
+    --bg-card: rgba(255, 255, 255, 0.9);
+    --bg-input: rgba(235, 235, 245, 0.9);
+    --bg-panel: rgba(255, 255, 255, 0.97);
+    --border: rgba(60, 60, 120, 0.15);
+    --cyan: #0277bd;
+    --magenta: #7b1fa2;
+    --green: #2e7d32;
+    --orange: #ef6c00;
+    --red: #c62828;
+    --text: #1a1a2e;
+    --text-dim: #555;
+    --text-muted: #888;
 }
 body {
     font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-    background: var(--bg-deep);
+    background: radial-gradient(circle at 30% 20%, rgba(102,126,234,0.08) 0%, transparent 50%),
+                radial-gradient(circle at 70% 80%, rgba(118,75,162,0.06) 0%, transparent 50%),
+                var(--bg-deep);
+    background-attachment: fixed;
     color: var(--text);
     line-height: 1.6;
     min-height: 100vh;
     overflow-x: hidden;
 }
-body::before {
-    content: '';
-    position: fixed;
-    top: -50%; left: -50%;
-    width: 200%; height: 200%;
-    background: radial-gradient(circle at 30% 20%, rgba(102,126,234,0.08) 0%, transparent 50%),
-                radial-gradient(circle at 70% 80%, rgba(118,75,162,0.06) 0%, transparent 50%);
-    z-index: -1;
-    animation: bgPulse 20s ease-in-out infinite;
-}
-@keyframes bgPulse {
-    0%, 100% { transform: translate(0, 0) rotate(0deg); }
-    50% { transform: translate(-2%, -1%) rotate(1deg); }
-}
 
 /* ── Layout ────────────────────────────────────────────────── */
 .app { max-width: 1400px; margin: 0 auto; padding: 20px; }
 .header {
-    text-align: center; padding: 30px 0 20px;
+    text-align: center; padding: 30px 0 20px; position: relative;
 }
+.header .theme-toggle { position: absolute; top: 30px; right: 0; }
 .header h1 {
     font-size: 2.2em; font-weight: 700;
     background: linear-gradient(135deg, var(--accent) 0%, var(--accent2) 100%);
@@ -76,7 +88,6 @@ body::before {
 .tabs {
     display: flex; gap: 4px; margin: 20px 0;
     background: var(--bg-card);
-    backdrop-filter: var(--glass);
     border-radius: var(--radius);
     border: 1px solid var(--border);
     padding: 4px;
@@ -86,13 +97,13 @@ body::before {
     flex: 1; padding: 12px 20px; border: none; background: transparent;
     color: var(--text-dim); font-family: inherit; font-size: 0.9em;
     font-weight: 500; cursor: pointer; border-radius: var(--radius-sm);
-    transition: all 0.3s ease; white-space: nowrap;
+    transition: color 0.3s ease, background 0.3s ease, box-shadow 0.3s ease; white-space: nowrap;
 }
 .tab-btn:hover { color: var(--text); background: rgba(102,126,234,0.1); }
 .tab-btn.active {
     background: linear-gradient(135deg, var(--accent), var(--accent2));
     color: white; font-weight: 600;
-    box-shadow: 0 4px 15px rgba(102,126,234,0.3);
+    box-shadow: var(--shadow-btn) rgba(102,126,234,0.3);
 }
 .tab-content { display: none; animation: fadeIn 0.3s ease; }
 .tab-content.active { display: block; }
@@ -101,15 +112,16 @@ body::before {
 /* ── Cards ─────────────────────────────────────────────────── */
 .card {
     background: var(--bg-card);
-    backdrop-filter: var(--glass);
     border: 1px solid var(--border);
     border-radius: var(--radius);
     padding: 24px;
     margin-bottom: 20px;
     transition: border-color 0.3s;
+    content-visibility: auto;
+    contain-intrinsic-size: auto 200px;
 }
 .card:hover { border-color: var(--border-active); }
-.card h2 {
+.card h2, .modal-box h3 {
     font-size: 1.2em; font-weight: 600; margin-bottom: 16px;
     display: flex; align-items: center; gap: 8px;
 }
@@ -119,13 +131,13 @@ body::before {
 .form-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(280px, 1fr)); gap: 16px; }
 .form-group { display: flex; flex-direction: column; gap: 6px; }
 .form-group label { font-size: 0.85em; font-weight: 500; color: var(--text-dim); }
-.form-group input, .form-group select {
+.form-group :is(input, select) {
     padding: 10px 14px; background: var(--bg-input); border: 1px solid var(--border);
     border-radius: var(--radius-sm); color: var(--text); font-family: inherit;
     font-size: 0.9em; transition: border-color 0.3s, box-shadow 0.3s;
     outline: none;
 }
-.form-group input:focus, .form-group select:focus {
+.form-group :is(input, select):focus {
     border-color: var(--accent); box-shadow: 0 0 0 3px rgba(102,126,234,0.15);
 }
 .form-group input::placeholder { color: var(--text-muted); }
@@ -135,27 +147,27 @@ body::before {
     padding: 10px 20px; border: none; border-radius: var(--radius-sm);
     font-family: inherit; font-size: 0.9em; font-weight: 500;
     cursor: pointer; display: inline-flex; align-items: center; gap: 8px;
-    transition: all 0.3s ease; position: relative; overflow: hidden;
+    transition: box-shadow 0.3s ease, transform 0.3s ease, border-color 0.3s ease, opacity 0.3s ease;
+    position: relative; overflow: hidden;
 }
 .btn::after {
     content: ''; position: absolute; top: 50%; left: 50%;
-    width: 0; height: 0; border-radius: 50%;
+    width: 50px; height: 50px; border-radius: 50%;
     background: rgba(255,255,255,0.2);
-    transition: width 0.4s, height 0.4s, top 0.4s, left 0.4s;
+    transform: translate(-50%, -50%) scale(0);
+    transition: transform 0.4s;
 }
-.btn:active::after { width: 200px; height: 200px; top: -60px; left: -60px; }
+.btn:active::after { transform: translate(-50%, -50%) scale(4); }
 .btn-primary {
     background: linear-gradient(135deg, var(--accent), var(--accent2));
     color: white;
-    box-shadow: 0 4px 15px rgba(102,126,234,0.25);
+    box-shadow: var(--shadow-btn) rgba(102,126,234,0.25);
 }
 .btn-primary:hover { box-shadow: 0 6px 20px rgba(102,126,234,0.4); transform: translateY(-1px); }
 .btn-secondary { background: var(--bg-input); color: var(--text); border: 1px solid var(--border); }
 .btn-secondary:hover { border-color: var(--accent); }
 .btn-success { background: linear-gradient(135deg, #43a047, #2e7d32); color: white; }
-.btn-success:hover { box-shadow: 0 4px 15px rgba(67,160,71,0.3); }
-.btn-danger { background: linear-gradient(135deg, var(--red), #c62828); color: white; }
-.btn-danger:hover { box-shadow: 0 4px 15px rgba(239,83,80,0.3); }
+.btn-success:hover { box-shadow: var(--shadow-btn) rgba(67,160,71,0.3); }
 .btn-sm { padding: 6px 12px; font-size: 0.8em; }
 .btn-group { display: flex; gap: 8px; flex-wrap: wrap; margin-top: 16px; }
 .btn:disabled { opacity: 0.5; cursor: not-allowed; transform: none !important; }
@@ -168,7 +180,7 @@ body::before {
 .stat-box {
     background: var(--bg-input); border: 1px solid var(--border);
     border-radius: var(--radius-sm); padding: 16px; text-align: center;
-    transition: all 0.3s;
+    transition: border-color 0.3s, transform 0.3s;
 }
 .stat-box:hover { border-color: var(--accent); transform: translateY(-2px); }
 .stat-value { font-size: 2em; font-weight: 700; }
@@ -195,7 +207,7 @@ body::before {
 .filter-pill {
     padding: 6px 14px; border-radius: 20px; border: 1px solid var(--border);
     background: transparent; color: var(--text-dim); font-family: inherit;
-    font-size: 0.8em; cursor: pointer; transition: all 0.2s;
+    font-size: 0.8em; cursor: pointer; transition: background 0.2s, border-color 0.2s, color 0.2s;
 }
 .filter-pill:hover { border-color: var(--accent); color: var(--text); }
 .filter-pill.active { background: var(--accent); color: white; border-color: var(--accent); }
@@ -207,7 +219,7 @@ body::before {
 .pages-table { width: 100%; border-collapse: separate; border-spacing: 0; }
 .pages-table thead th {
     position: sticky; top: 0; z-index: 10;
-    background: rgba(15,15,35,0.95); backdrop-filter: var(--glass);
+    background: var(--bg-panel);
     padding: 12px 14px; text-align: left; font-size: 0.8em;
     font-weight: 600; text-transform: uppercase; letter-spacing: 1px;
     color: var(--accent); border-bottom: 1px solid var(--border);
@@ -253,7 +265,7 @@ body::before {
 /* ── Page detail panel ─────────────────────────────────────── */
 .detail-panel {
     position: fixed; top: 0; right: -450px; width: 440px; height: 100vh;
-    background: rgba(12,12,30,0.97); backdrop-filter: var(--glass);
+    background: var(--bg-panel);
     border-left: 1px solid var(--border); z-index: 100;
     transition: right 0.3s ease; overflow-y: auto; padding: 24px;
 }
@@ -264,7 +276,7 @@ body::before {
     border: 1px solid var(--border); background: var(--bg-input);
     color: var(--text); cursor: pointer; font-size: 1.2em;
     display: flex; align-items: center; justify-content: center;
-    transition: all 0.2s;
+    transition: border-color 0.2s, color 0.2s;
 }
 .detail-close:hover { border-color: var(--red); color: var(--red); }
 .detail-panel h3 { font-size: 1.3em; margin-bottom: 16px; padding-right: 40px; }
@@ -278,7 +290,7 @@ body::before {
 }
 .detail-thumbs { display: flex; gap: 8px; flex-wrap: wrap; margin-top: 12px; }
 .detail-thumbs img {
-    width: 100px; height: 70px; object-fit: cover;
+    width: 100px; height: 70px; aspect-ratio: 100 / 70; object-fit: cover;
     border-radius: 6px; border: 1px solid var(--border);
 }
 
@@ -307,11 +319,14 @@ body::before {
     transition: width 0.5s ease;
     position: relative; overflow: hidden;
 }
-.progress-bar::after {
+/* The shine only exists while a migration runs (.active set from JS) */
+.progress-bar.active::after {
     content: ''; position: absolute; top: 0; left: -200%;
     width: 200%; height: 100%;
     background: linear-gradient(90deg, transparent, rgba(255,255,255,0.1), transparent);
-    animation: progressShine 2s infinite;
+}
+@media (prefers-reduced-motion: no-preference) {
+    .progress-bar.active::after { animation: progressShine 2s infinite; }
 }
 @keyframes progressShine { to { left: 200%; } }
 .progress-text {
@@ -350,7 +365,7 @@ body::before {
     width: 18px; height: 18px; border-radius: 4px;
     border: 2px solid var(--border); background: transparent;
     cursor: pointer; appearance: none; -webkit-appearance: none;
-    transition: all 0.2s; position: relative;
+    transition: background 0.2s, border-color 0.2s; position: relative;
 }
 .custom-check:checked {
     background: var(--accent); border-color: var(--accent);
@@ -399,10 +414,6 @@ body::before {
     transform: translateY(20px); transition: transform 0.25s ease;
 }
 .modal-overlay.show .modal-box { transform: translateY(0); }
-.modal-box h3 {
-    font-size: 1.2em; font-weight: 600; margin-bottom: 16px;
-    display: flex; align-items: center; gap: 8px;
-}
 .modal-box .separator {
     height: 1px; background: var(--border); margin: 16px 0;
 }
@@ -421,29 +432,49 @@ body::before {
 .detail-edit-row label {
     font-size: 0.82em; color: var(--text-dim); min-width: 110px;
 }
-.detail-edit-row input, .detail-edit-row select {
+.detail-edit-row :is(input, select) {
     flex: 1; padding: 6px 10px; background: var(--bg-input);
     border: 1px solid var(--border); border-radius: 6px;
     color: var(--text); font-family: inherit; font-size: 0.85em;
     outline: none;
 }
-.detail-edit-row input:focus, .detail-edit-row select:focus {
+.detail-edit-row :is(input, select):focus {
     border-color: var(--accent);
 }
-</style>
+'''
+
+_HEAD_OPEN = '''<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>WP → PrestaShop Migration</title>
+<script>try { if (localStorage.getItem('theme') === 'light') document.documentElement.dataset.theme = 'light'; } catch (e) {}</script>
+<link rel="preconnect" href="https://fonts.googleapis.com">
+<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+<link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet">
+'''
+
+# Follows the inlined critical CSS; __CSS_PATH__ is the hashed deferred stylesheet
+_HEAD_CLOSE = '''
+<link rel="preload" href="__CSS_PATH__" as="style" onload="this.rel='stylesheet'">
+<noscript><link rel="stylesheet" href="__CSS_PATH__"></noscript>
 </head>
-<body>
+'''
+
+_BODY = '''<body>
 <div class="app">
     <div class="header">
         <h1>🚀 WordPress → PrestaShop</h1>
+        <button class="btn btn-sm btn-secondary theme-toggle" data-action="toggleTheme" title="Thème clair / sombre">🌓</button>
         <p class="subtitle">Outil de migration de contenu</p>
     </div>
 
     <div class="tabs">
-        <button class="tab-btn active" onclick="switchTab('config')">⚙️ Configuration</button>
-        <button class="tab-btn" onclick="switchTab('scanner')">🔍 Scanner & Router</button>
-        <button class="tab-btn" onclick="switchTab('migration')">🚀 Migration</button>
-        <button class="tab-btn" onclick="switchTab('results')">📊 Résultats</button>
+        <button class="tab-btn active" data-action="switchTab" data-arg="config">⚙️ Configuration</button>
+        <button class="tab-btn" data-action="switchTab" data-arg="scanner">🔍 Scanner & Router</button>
+        <button class="tab-btn" data-action="switchTab" data-arg="migration">🚀 Migration</button>
+        <button class="tab-btn" data-action="switchTab" data-arg="results">📊 Résultats</button>
     </div>
 
     <!-- ═══════════ CONFIG TAB ═══════════ -->
@@ -508,7 +539,7 @@ body::before {
                     <input type="text" id="cfg-img-dir" placeholder="/var/www/prestashop/img/cms/" />
                 </div>
 
-                <h3 style="margin-top:20px; color:var(--primary)">📡 Upload FTP des images</h3>
+                <h3 style="margin-top:20px; color:var(--accent)">📡 Upload FTP des images</h3>
                 <div class="form-group">
                     <label>Hôte FTP</label>
                     <input type="text" id="cfg-ftp-host" placeholder="shop.korteldesign.com" />
@@ -529,8 +560,8 @@ body::before {
         </div>
 
         <div class="btn-group">
-            <button class="btn btn-primary" onclick="saveConfig()">💾 Sauvegarder la configuration</button>
-            <button class="btn btn-secondary" onclick="testConnection()">🔌 Tester les connexions</button>
+            <button class="btn btn-primary" data-action="saveConfig">💾 Sauvegarder la configuration</button>
+            <button class="btn btn-secondary" data-action="testConnection">🔌 Tester les connexions</button>
         </div>
 
         <div id="connection-status" class="card" style="margin-top:16px; display:none">
@@ -551,8 +582,12 @@ body::before {
                     <label>URL WordPress</label>
                     <input type="url" id="scan-url" placeholder="https://www.korteldesign.com" />
                 </div>
-                <button class="btn btn-primary" onclick="scanWordPress()" id="btn-scan">🔍 Scanner</button>
+                <button class="btn btn-primary" data-action="scanWordPress" id="btn-scan">🔍 Scanner</button>
             </div>
+            <label style="display:block; margin-top:10px">
+                <input type="checkbox" id="scan-full" class="custom-check" style="vertical-align:middle" />
+                Scan complet — ignorer le cache du scan précédent
+            </label>
         </div>
 
         <div id="scan-results" style="display:none">
@@ -566,26 +601,26 @@ body::before {
             </div>
 
             <div class="toolbar">
-                <input type="text" class="search-input" id="search-pages" placeholder="🔎 Rechercher..." oninput="filterPages()" />
-                <button class="filter-pill active" data-filter="all" onclick="setFilter('all', this)">Tout</button>
-                <button class="filter-pill pill-cms" data-filter="cms" onclick="setFilter('cms', this)">📄 CMS</button>
-                <button class="filter-pill pill-product" data-filter="product" onclick="setFilter('product', this)">🏷️ Produits</button>
-                <button class="filter-pill pill-skip" data-filter="skip" onclick="setFilter('skip', this)">⏭️ Ignorées</button>
+                <input type="text" class="search-input" id="search-pages" placeholder="🔎 Rechercher..." />
+                <button class="filter-pill active" data-filter="all" data-action="setFilter" data-arg="all">Tout</button>
+                <button class="filter-pill pill-cms" data-filter="cms" data-action="setFilter" data-arg="cms">📄 CMS</button>
+                <button class="filter-pill pill-product" data-filter="product" data-action="setFilter" data-arg="product">🏷️ Produits</button>
+                <button class="filter-pill pill-skip" data-filter="skip" data-action="setFilter" data-arg="skip">⏭️ Ignorées</button>
                 <span style="border-left:1px solid var(--border); height:20px; margin:0 4px"></span>
-                <button class="filter-pill" data-filter="type-page" onclick="setFilter('type-page', this)">📃 Pages</button>
-                <button class="filter-pill" data-filter="type-post" onclick="setFilter('type-post', this)">📝 Articles</button>
+                <button class="filter-pill" data-filter="type-page" data-action="setFilter" data-arg="type-page">📃 Pages</button>
+                <button class="filter-pill" data-filter="type-post" data-action="setFilter" data-arg="type-post">📝 Articles</button>
                 <span style="flex:1"></span>
-                <button class="btn btn-sm btn-secondary" onclick="bulkAction('cms')">📄 Sélection → CMS</button>
-                <button class="btn btn-sm btn-secondary" onclick="bulkAction('product')">🏷️ Sélection → Produit</button>
-                <button class="btn btn-sm btn-secondary" onclick="bulkAction('skip')">⏭️ Sélection → Ignorer</button>
-                <button class="btn btn-sm btn-secondary" onclick="autoCateg()">🤖 Auto</button>
+                <button class="btn btn-sm btn-secondary" data-action="bulkAction" data-arg="cms">📄 Sélection → CMS</button>
+                <button class="btn btn-sm btn-secondary" data-action="bulkAction" data-arg="product">🏷️ Sélection → Produit</button>
+                <button class="btn btn-sm btn-secondary" data-action="bulkAction" data-arg="skip">⏭️ Sélection → Ignorer</button>
+                <button class="btn btn-sm btn-secondary" data-action="autoCateg">🤖 Auto</button>
             </div>
 
             <div style="overflow-x:auto; max-height:65vh; overflow-y:auto; border-radius:var(--radius-sm); border:1px solid var(--border)">
                 <table class="pages-table">
                     <thead>
                         <tr>
-                            <th class="col-check"><input type="checkbox" class="custom-check" id="check-all" onchange="toggleAll(this)" /></th>
+                            <th class="col-check"><input type="checkbox" class="custom-check" id="check-all" data-change="toggleAll" /></th>
                             <th class="col-target">Destination</th>
                             <th class="col-slug">Slug</th>
                             <th class="col-title">Titre</th>
@@ -597,6 +632,7 @@ body::before {
                     </thead>
                     <tbody id="pages-body"></tbody>
                 </table>
+                <template id="tpl-row"><tr><td class="col-check"><input type="checkbox" class="custom-check page-check" /></td><td class="col-target"><select class="target-select"><option value="cms">📄 CMS</option><option value="product">🏷️ Produit</option><option value="skip">⏭️ Ignorer</option></select></td><td class="col-slug"><span class="slug-text"></span></td><td class="col-title"></td><td class="col-size"></td><td class="col-size"></td><td class="col-img"></td><td class="col-seo"></td></tr></template>
             </div>
         </div>
 
@@ -616,9 +652,9 @@ body::before {
                 <div class="stat-box stat-skip"><div class="stat-value" id="mig-skip">0</div><div class="stat-label">Ignorées</div></div>
             </div>
             <div class="btn-group">
-                <button class="btn btn-primary" onclick="startMigration(true)" id="btn-dry">🔍 Dry Run (test)</button>
-                <button class="btn btn-success" onclick="startMigration(false)" id="btn-live">🚀 Migration LIVE</button>
-                <button class="btn btn-secondary" onclick="saveMappingOnly()">💾 Sauvegarder le mapping</button>
+                <button class="btn btn-primary" data-action="startMigration" data-arg="dry" id="btn-dry">🔍 Dry Run (test)</button>
+                <button class="btn btn-success" data-action="startMigration" data-arg="live" id="btn-live">🚀 Migration LIVE</button>
+                <button class="btn btn-secondary" data-action="saveMappingOnly">💾 Sauvegarder le mapping</button>
             </div>
         </div>
 
@@ -653,7 +689,7 @@ body::before {
 
 <!-- Detail side panel -->
 <div class="detail-panel" id="detail-panel">
-    <button class="detail-close" onclick="closeDetail()">✕</button>
+    <button class="detail-close" data-action="closeDetail">✕</button>
     <h3 id="detail-title"></h3>
     <dl class="detail-meta" id="detail-meta"></dl>
     <div class="detail-preview" id="detail-preview"></div>
@@ -664,14 +700,14 @@ body::before {
 <div class="toast-container" id="toasts"></div>
 
 <!-- Bulk action modal -->
-<div class="modal-overlay" id="bulk-modal" onclick="if(event.target===this)closeBulkModal()">
+<div class="modal-overlay" id="bulk-modal" data-action="closeBulkModalOutside">
     <div class="modal-box">
         <h3 id="modal-title">Configuration</h3>
         <div id="modal-body"></div>
         <div class="separator"></div>
         <div class="btn-group" style="justify-content:flex-end">
-            <button class="btn btn-secondary" onclick="closeBulkModal()">Annuler</button>
-            <button class="btn btn-primary" id="modal-confirm" onclick="confirmBulkModal()">Appliquer</button>
+            <button class="btn btn-secondary" data-action="closeBulkModal">Annuler</button>
+            <button class="btn btn-primary" id="modal-confirm" data-action="confirmBulkModal">Appliquer</button>
         </div>
     </div>
 </div>
@@ -679,8 +715,28 @@ body::before {
 <script>
 // ── State ────────────────────────────────────────────────────
 let pages = [];
+const pagesBySlug = new Map();  // slug → its pages; targets and options are shared per slug, as on the server
+// Pages bucketed by filter value, kept in step with p.target by setPageTarget()
+const byType = { page: new Set(), post: new Set() };
+const byTarget = { cms: new Set(), product: new Set(), skip: new Set() };
 let currentFilter = 'all';
 let migrationPollInterval = null;
+let migrationLog = [];
+let renderedLogCount = 0;   // server-side line total already appended to the log
+
+// Fixed nodes touched on every render / poll tick, looked up once
+const $ = id => document.getElementById(id);
+const els = {
+    statTotal: $('stat-total'), statPages: $('stat-pages'), statPosts: $('stat-posts'),
+    statCms: $('stat-cms'), statProduct: $('stat-product'), statSkip: $('stat-skip'),
+    migCms: $('mig-cms'), migProduct: $('mig-product'), migSkip: $('mig-skip'),
+    migBar: $('mig-bar'), migBarText: $('mig-bar-text'), migLog: $('mig-log'),
+    migProgressCard: $('mig-progress-card'), btnDry: $('btn-dry'), btnLive: $('btn-live'),
+    pagesBody: $('pages-body'), searchPages: $('search-pages'),
+    detailPanel: $('detail-panel'), detailTitle: $('detail-title'), detailMeta: $('detail-meta'),
+    detailPreview: $('detail-preview'), detailThumbs: $('detail-thumbs'),
+    toasts: $('toasts'),
+};
 
 // ── API helpers ──────────────────────────────────────────────
 async function api(method, path, body) {
@@ -691,12 +747,21 @@ async function api(method, path, body) {
 }
 
 // ── Toast notifications ──────────────────────────────────────
+// A fixed set of slots is recycled oldest-first; a repeat of the newest toast only extends it
+const TOAST_SLOTS = 5;
+const toastSlots = [];
 function toast(msg, type = 'info') {
-    const el = document.createElement('div');
-    el.className = 'toast ' + type;
-    el.textContent = msg;
-    document.getElementById('toasts').appendChild(el);
-    setTimeout(() => el.remove(), 4000);
+    let el = toastSlots[toastSlots.length - 1];
+    if (!el || el.hidden || el.textContent !== msg || el.className !== 'toast ' + type) {
+        el = toastSlots.length < TOAST_SLOTS ? document.createElement('div') : toastSlots.shift();
+        toastSlots.push(el);
+        el.className = 'toast ' + type;
+        el.textContent = msg;
+        el.hidden = false;
+        els.toasts.appendChild(el);  // moves a recycled slot last and replays slideIn
+    }
+    clearTimeout(el.hideTimer);
+    el.hideTimer = setTimeout(() => { el.hidden = true; }, 4000);
 }
 
 // ── CMS Categories cache ─────────────────────────────────────
@@ -716,11 +781,20 @@ function cmsCatOptions(selectedId) {
 }
 
 // ── Tabs ─────────────────────────────────────────────────────
+// Tab buttons and panes by name; switching only touches the outgoing and incoming pair
+const tabs = new Map(Array.from(document.getElementsByClassName('tab-btn'),
+    btn => [btn.dataset.arg, { btn, pane: $('tab-' + btn.dataset.arg) }]));
+let activeTab = tabs.get('config');
+
 function switchTab(name) {
-    document.querySelectorAll('.tab-btn').forEach(b => b.classList.remove('active'));
-    document.querySelectorAll('.tab-content').forEach(c => c.classList.remove('active'));
-    document.querySelector(`[onclick="switchTab('${name}')"]`).classList.add('active');
-    document.getElementById('tab-' + name).classList.add('active');
+    const tab = tabs.get(name);
+    if (activeTab) {
+        activeTab.btn.classList.remove('active');
+        activeTab.pane.classList.remove('active');
+    }
+    tab.btn.classList.add('active');
+    tab.pane.classList.add('active');
+    activeTab = tab;
 
     if (name === 'migration') updateMigStats();
     if (name === 'scanner' && !document.getElementById('scan-url').value) {
@@ -730,78 +804,74 @@ function switchTab(name) {
 }
 
 // ── Config ───────────────────────────────────────────────────
+// Config form fields: [id, section, key, kind, default]. 'cat' is the CMS category
+// <select>, whose options are rebuilt from cmsCats on load.
+const CFG_FIELDS = [
+    ['cfg-wp-url', 'wordpress', 'url', 'str', ''],
+    ['cfg-wp-user', 'wordpress', 'username', 'str', ''],
+    ['cfg-wp-pass', 'wordpress', 'app_password', 'str', ''],
+    ['cfg-ps-url', 'prestashop', 'url', 'str', ''],
+    ['cfg-ps-key', 'prestashop', 'api_key', 'str', ''],
+    ['cfg-ps-lang', 'prestashop', 'default_lang_id', 'int', 1],
+    ['cfg-ps-cat', 'prestashop', 'cms_category_id', 'cat', 1],
+    ['cfg-dry-run', 'migration', 'dry_run', 'bool', true],
+    ['cfg-images', 'migration', 'download_images', 'bool', true],
+    ['cfg-img-dir', 'migration', 'image_target_dir', 'str', ''],
+    ['cfg-ftp-host', 'migration', 'ftp_host', 'str', ''],
+    ['cfg-ftp-user', 'migration', 'ftp_user', 'str', ''],
+    ['cfg-ftp-pass', 'migration', 'ftp_password', 'str', ''],
+    ['cfg-ftp-path', 'migration', 'ftp_remote_path', 'str', '/img/cms'],
+].map(([id, section, key, kind, dflt]) => ({ el: $(id), section, key, kind, dflt }));
+
 async function loadConfig() {
-    const cfg = await api('GET', '/api/config');
-    if (cfg.wordpress) {
-        document.getElementById('cfg-wp-url').value = cfg.wordpress.url || '';
-        document.getElementById('cfg-wp-user').value = cfg.wordpress.username || '';
-        document.getElementById('cfg-wp-pass').value = cfg.wordpress.app_password || '';
-    }
-    if (cfg.prestashop) {
-        document.getElementById('cfg-ps-url').value = cfg.prestashop.url || '';
-        document.getElementById('cfg-ps-key').value = cfg.prestashop.api_key || '';
-        document.getElementById('cfg-ps-lang').value = cfg.prestashop.default_lang_id || 1;
-        // Load CMS categories then set dropdown
-        await loadCmsCategories();
-        const catSel = document.getElementById('cfg-ps-cat');
-        catSel.innerHTML = cmsCatOptions(cfg.prestashop.cms_category_id || 1);
-    }
-    if (cfg.migration) {
-        document.getElementById('cfg-dry-run').checked = cfg.migration.dry_run !== false;
-        document.getElementById('cfg-images').checked = cfg.migration.download_images !== false;
-        document.getElementById('cfg-img-dir').value = cfg.migration.image_target_dir || '';
-        document.getElementById('cfg-ftp-host').value = cfg.migration.ftp_host || '';
-        document.getElementById('cfg-ftp-user').value = cfg.migration.ftp_user || '';
-        document.getElementById('cfg-ftp-pass').value = cfg.migration.ftp_password || '';
-        document.getElementById('cfg-ftp-path').value = cfg.migration.ftp_remote_path || '/img/cms';
+    // The category list comes from the server-side config, so both requests can overlap
+    const [cfg] = await Promise.all([api('GET', '/api/config'), loadCmsCategories()]);
+    for (const f of CFG_FIELDS) {
+        const section = cfg[f.section];
+        if (!section) continue;
+        const v = section[f.key];
+        if (f.kind === 'bool') f.el.checked = v !== false;
+        else if (f.kind === 'cat') f.el.innerHTML = cmsCatOptions(v || f.dflt);
+        else f.el.value = v || f.dflt;
     }
 }
 
 async function saveConfig() {
-    const cfg = {
-        wordpress: {
-            url: document.getElementById('cfg-wp-url').value,
-            username: document.getElementById('cfg-wp-user').value,
-            app_password: document.getElementById('cfg-wp-pass').value,
-        },
-        prestashop: {
-            url: document.getElementById('cfg-ps-url').value,
-            api_key: document.getElementById('cfg-ps-key').value,
-            default_lang_id: parseInt(document.getElementById('cfg-ps-lang').value) || 1,
-            cms_category_id: parseInt(document.getElementById('cfg-ps-cat').value) || 1,
-        },
-        migration: {
-            dry_run: document.getElementById('cfg-dry-run').checked,
-            download_images: document.getElementById('cfg-images').checked,
-            image_target_dir: document.getElementById('cfg-img-dir').value,
-            ftp_host: document.getElementById('cfg-ftp-host').value,
-            ftp_user: document.getElementById('cfg-ftp-user').value,
-            ftp_password: document.getElementById('cfg-ftp-pass').value,
-            ftp_remote_path: document.getElementById('cfg-ftp-path').value,
-            log_file: 'migration.log',
-        }
-    };
-    await api('POST', '/api/config', cfg);
+    const cfg = { wordpress: {}, prestashop: {}, migration: {} };
+    for (const f of CFG_FIELDS) {
+        cfg[f.section][f.key] = f.kind === 'bool' ? f.el.checked
+            : f.kind === 'str' ? f.el.value
+            : parseInt(f.el.value) || f.dflt;
+    }
+    cfg.migration.log_file = 'migration.log';
+    await Promise.all([api('POST', '/api/config', cfg), flushRoutes()]);
     toast('Configuration sauvegardée ✅', 'success');
 }
 
 async function testConnection() {
-    document.getElementById('connection-status').style.display = 'block';
-    document.getElementById('wp-status-dot').className = 'status-dot pending';
-    document.getElementById('ps-status-dot').className = 'status-dot pending';
-    document.getElementById('wp-status-text').textContent = 'test...';
-    document.getElementById('ps-status-text').textContent = 'test...';
-
-    const result = await api('POST', '/api/test-connection', {
-        wp_url: document.getElementById('cfg-wp-url').value,
-        ps_url: document.getElementById('cfg-ps-url').value,
-        ps_key: document.getElementById('cfg-ps-key').value,
-    });
-
-    document.getElementById('wp-status-dot').className = 'status-dot ' + (result.wordpress ? 'ok' : 'fail');
-    document.getElementById('wp-status-text').textContent = result.wordpress ? '✅ Connecté' : '❌ ' + (result.wp_error || 'Échec');
-    document.getElementById('ps-status-dot').className = 'status-dot ' + (result.prestashop ? 'ok' : 'fail');
-    document.getElementById('ps-status-text').textContent = result.prestashop ? '✅ Connecté' : '❌ ' + (result.ps_error || 'Échec');
+    // Read everything first, then write: no DOM read sits between two writes
+    const payload = {
+        wp_url: $('cfg-wp-url').value,
+        ps_url: $('cfg-ps-url').value,
+        ps_key: $('cfg-ps-key').value,
+    };
+    const wpDot = $('wp-status-dot'), wpText = $('wp-status-text');
+    const psDot = $('ps-status-dot'), psText = $('ps-status-text');
+
+    $('connection-status').style.display = 'block';
+    wpDot.className = psDot.className = 'status-dot pending';
+    wpText.textContent = psText.textContent = 'test...';
+
+    // One request per side, so each dot settles as soon as its own probe answers
+    const probe = async (path, dot, text) => {
+        const r = await api('POST', path, payload);
+        dot.className = 'status-dot ' + (r.ok ? 'ok' : 'fail');
+        text.textContent = r.ok ? '✅ Connecté' : '❌ ' + (r.error || 'Échec');
+    };
+    await Promise.all([
+        probe('/api/test-wp', wpDot, wpText),
+        probe('/api/test-ps', psDot, psText),
+    ]);
 }
 
 // ── Scanner ──────────────────────────────────────────────────
@@ -814,7 +884,8 @@ async function scanWordPress() {
     btn.innerHTML = '<span class="spinner"></span> Scan en cours...';
 
     try {
-        const result = await api('POST', '/api/scan', { url });
+        const full = document.getElementById('scan-full').checked;
+        const result = await api('POST', '/api/scan', { url, full });
         if (result.error) { toast(result.error, 'error'); return; }
 
         toast(`${result.total} pages trouvées`, 'success');
@@ -831,95 +902,216 @@ async function scanWordPress() {
 
 async function loadPages() {
     pages = await api('GET', '/api/pages');
+    pagesBySlug.clear();
+    for (const set of [...Object.values(byType), ...Object.values(byTarget)]) set.clear();
+    // Search keys are lowercased once here rather than on every keystroke
+    for (const p of pages) {
+        const same = pagesBySlug.get(p.slug);
+        if (same) same.push(p); else pagesBySlug.set(p.slug, [p]);
+        byType[p.wp_type]?.add(p);
+        byTarget[p.target]?.add(p);
+        p._slugLower = p.slug.toLowerCase();
+        p._titleLower = p.title.toLowerCase();
+    }
     updateStats();
+    buildRows();
     renderPages();
 }
 
-function updateStats() {
-    const cms = pages.filter(p => p.target === 'cms').length;
-    const product = pages.filter(p => p.target === 'product').length;
-    const skip = pages.filter(p => p.target === 'skip').length;
-    const pageCount = pages.filter(p => p.wp_type === 'page').length;
-    const postCount = pages.filter(p => p.wp_type === 'post').length;
+// Per-target / per-type counts, refreshed by updateStats after every change to pages
+let pageCounts = { cms: 0, product: 0, skip: 0, page: 0, post: 0 };
 
-    document.getElementById('stat-total').textContent = pages.length;
-    document.getElementById('stat-pages').textContent = pageCount;
-    document.getElementById('stat-posts').textContent = postCount;
-    document.getElementById('stat-cms').textContent = cms;
-    document.getElementById('stat-product').textContent = product;
-    document.getElementById('stat-skip').textContent = skip;
-}
+function updateStats() {
+    const c = pageCounts = {
+        cms: byTarget.cms.size, product: byTarget.product.size, skip: byTarget.skip.size,
+        page: byType.page.size, post: byType.post.size,
+    };
 
-function renderPages() {
-    const tbody = document.getElementById('pages-body');
-    const search = document.getElementById('search-pages').value.toLowerCase();
-
-    const filtered = pages.filter(p => {
-        if (currentFilter === 'type-page' && p.wp_type !== 'page') return false;
-        if (currentFilter === 'type-post' && p.wp_type !== 'post') return false;
-        if (['cms','product','skip'].includes(currentFilter) && p.target !== currentFilter) return false;
-        if (search && !p.slug.includes(search) && !p.title.toLowerCase().includes(search)) return false;
-        return true;
+    els.statTotal.textContent = pages.length;
+    els.statPages.textContent = c.page;
+    els.statPosts.textContent = c.post;
+    els.statCms.textContent = c.cms;
+    els.statProduct.textContent = c.product;
+    els.statSkip.textContent = c.skip;
+}
+
+// One <tr> per page, built when pages is (re)loaded; filtering only toggles row.hidden
+const rowMap = new Map();  // page → <tr>; a page and a post may share a slug
+const selectMap = new Map();  // page → that row's target <select>
+
+function buildRows() {
+    const frag = document.createDocumentFragment();
+    rowMap.clear();
+    selectMap.clear();
+    for (const p of pages) {
+        const tr = rowFromTemplate(p);
+        rowMap.set(p, tr);
+        selectMap.set(p, tr.cells[1].firstElementChild);
+        frag.appendChild(tr);
+    }
+    els.pagesBody.replaceChildren(frag);
+    shownRows = new Set(rowMap.values());
+}
+
+// Bulk changes repaint on the next frame, so the click handler returns at once
+// and several changes within one frame share a single pass
+let rerenderQueued = false;
+function scheduleRerender() {
+    if (rerenderQueued) return;
+    rerenderQueued = true;
+    requestAnimationFrame(() => {
+        rerenderQueued = false;
+        updateStats();
+        renderPages();
     });
-
-    tbody.innerHTML = filtered.map((p, i) => {
-        const selectClass = 'target-select target-' + p.target;
-        const typeBadge = p.wp_type === 'post'
-            ? '<span class="type-badge type-post">Article</span>'
-            : '<span class="type-badge type-page">Page</span>';
-        const cats = (p.category_names || []).map(c => `<span class="category-tag">${escHtml(c)}</span>`).join('');
-        return `<tr onclick="showDetail('${p.slug}')" data-slug="${p.slug}">
-            <td class="col-check" onclick="event.stopPropagation()">
-                <input type="checkbox" class="custom-check page-check" data-slug="${p.slug}" />
-            </td>
-            <td class="col-target" onclick="event.stopPropagation()">
-                <select class="${selectClass}" onchange="changeTarget('${p.slug}', this.value, this)"
-                    data-slug="${p.slug}">
-                    <option value="cms" ${p.target==='cms'?'selected':''}>📄 CMS</option>
-                    <option value="product" ${p.target==='product'?'selected':''}>🏷️ Produit</option>
-                    <option value="skip" ${p.target==='skip'?'selected':''}>⏭️ Ignorer</option>
-                </select>
-            </td>
-            <td class="col-slug"><span class="slug-text">${p.slug}</span></td>
-            <td class="col-title">${escHtml(p.title)}${cats}</td>
-            <td class="col-size">${typeBadge}</td>
-            <td class="col-size">${p.content_size}</td>
-            <td class="col-img">${p.image_count}</td>
-            <td class="col-seo">${p.has_seo ? '✅' : '❌'}</td>
-        </tr>`;
-    }).join('');
 }
 
-function escHtml(s) {
-    const d = document.createElement('div');
-    d.textContent = s;
-    return d.innerHTML;
+function setPageTarget(p, target) {
+    byTarget[p.target]?.delete(p);
+    byTarget[target]?.add(p);
+    p.target = target;
 }
 
-async function changeTarget(slug, target, selectEl) {
-    await api('POST', '/api/pages/route', { slug, target });
-    const p = pages.find(x => x.slug === slug);
-    if (p) p.target = target;
-    selectEl.className = 'target-select target-' + target;
+// Only the active bucket is scanned; rows leave the view through the previous visible set
+let shownRows = new Set();
+function renderPages() {
+    const search = els.searchPages.value.toLowerCase();
+    const pool = currentFilter === 'all' ? pages
+        : (currentFilter.startsWith('type-') ? byType[currentFilter.slice(5)] : byTarget[currentFilter]) || [];
+    const shown = new Set();
+    for (const p of pool) {
+        if (search && !p._slugLower.includes(search) && !p._titleLower.includes(search)) continue;
+        shown.add(rowMap.get(p));
+    }
+    for (const tr of shownRows) if (!shown.has(tr)) tr.hidden = true;
+    for (const tr of shown) if (tr.hidden) tr.hidden = false;
+    shownRows = shown;
+}
+
+// Rows outlive target changes made elsewhere (bulk modal, detail panel): keep their select in sync
+function syncRowTarget(p) {
+    const sel = selectMap.get(p);
+    if (!sel) return;
+    sel.value = p.target;
+    sel.className = 'target-select target-' + p.target;
+}
+
+// Rows are cloned from #tpl-row and filled through text nodes: no HTML parsing per row
+const rowTemplate = $('tpl-row').content.firstElementChild;
+const typeBadges = {};
+for (const [type, label] of [['post', 'Article'], ['page', 'Page']]) {
+    const badge = typeBadges[type] = document.createElement('span');
+    badge.className = 'type-badge type-' + type;
+    badge.textContent = label;
+}
+
+// Slugs are not unique (a page and a post may share one): rows also remember their page
+const rowPage = new WeakMap();  // <tr> → page
+
+function rowFromTemplate(p) {
+    const tr = rowTemplate.cloneNode(true);
+    tr.dataset.slug = p.slug;
+    rowPage.set(tr, p);
+    const [, tdTarget, tdSlug, tdTitle, tdType, tdSize, tdImg, tdSeo] = tr.cells;
+    const sel = tdTarget.firstElementChild;
+    sel.value = p.target;
+    sel.className = 'target-select target-' + p.target;
+    tdSlug.firstElementChild.textContent = p.slug;
+    tdTitle.textContent = p.title;
+    for (const c of p.category_names || []) tdTitle.appendChild(catTag(c));
+    tdType.appendChild(typeBadges[p.wp_type === 'post' ? 'post' : 'page'].cloneNode(true));
+    tdSize.textContent = p.content_size;
+    tdImg.textContent = p.image_count;
+    tdSeo.textContent = p.has_seo ? '✅' : '❌';
+    return tr;
+}
+
+// One listener pair on the tbody serves every row
+// Row controls carry no slug of their own: the delegated handlers read it from the <tr>
+els.pagesBody.addEventListener('click', e => {
+    if (e.target.closest('.col-check, .col-target')) return;
+    const tr = e.target.closest('tr[data-slug]');
+    if (tr) showDetail(tr.dataset.slug, rowPage.get(tr));
+});
+els.pagesBody.addEventListener('change', e => {
+    const sel = e.target.closest('select.target-select');
+    if (sel) changeTarget(sel.closest('tr').dataset.slug, sel.value);
+});
+
+const escDiv = document.createElement('div');
+function escHtml(s) {
+    escDiv.textContent = s;
+    return escDiv.innerHTML;
+}
+
+// Category names repeat across most rows: build each tag once, then clone it
+const catTagCache = new Map();
+function catTag(c) {
+    let tag = catTagCache.get(c);
+    if (tag === undefined) {
+        tag = document.createElement('span');
+        tag.className = 'category-tag';
+        tag.textContent = c;
+        catTagCache.set(c, tag);
+    }
+    return tag.cloneNode(true);
+}
+
+// Destination changes apply locally at once; the server gets them in one request per burst
+const routeQueue = new Map();
+let routeTimer = null;
+function queueRoute(slug, target) {
+    routeQueue.set(slug, target);
+    clearTimeout(routeTimer);
+    routeTimer = setTimeout(flushRoutes, 150);
+}
+
+// Awaited before any other route-changing request, so a late flush cannot undo its result
+let routeFlush = null;  // bulk-route request of the previous burst, if still in flight
+async function flushRoutes() {
+    clearTimeout(routeTimer);
+    await routeFlush?.catch(() => {});  // its caller reports a failure
+    if (!routeQueue.size) return;
+    const routes = Object.fromEntries(routeQueue);
+    routeQueue.clear();
+    routeFlush = api('POST', '/api/pages/bulk-route', { routes });
+    await routeFlush;
+}
+
+function changeTarget(slug, target) {
+    queueRoute(slug, target);
+    for (const p of pagesBySlug.get(slug) || []) {
+        setPageTarget(p, target);
+        syncRowTarget(p);
+    }
     updateStats();
     toast(`${slug} → ${targetLabel(target)}`, 'success');
 }
 
-function filterPages() { renderPages(); }
+// Typing re-filters once the keystrokes pause for 120 ms
+let searchTimer = null;
+function filterPages() {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(renderPages, 120);
+}
+let activePill = null;
 function setFilter(f, btn) {
     currentFilter = f;
-    document.querySelectorAll('.filter-pill').forEach(b => b.classList.remove('active'));
+    (activePill || document.querySelector('.filter-pill.active')).classList.remove('active');
     btn.classList.add('active');
+    activePill = btn;
     renderPages();
 }
 
 function toggleAll(el) {
-    document.querySelectorAll('.page-check').forEach(cb => cb.checked = el.checked);
+    rowMap.forEach(tr => { if (!tr.hidden) tr.cells[0].firstElementChild.checked = el.checked; });
 }
 
 async function bulkAction(target) {
-    const slugs = Array.from(document.querySelectorAll('.page-check:checked'))
-        .map(cb => cb.dataset.slug);
+    // Rows hidden by the current filter keep their checkbox state but are not part of the selection
+    const slugs = Array.from(els.pagesBody.querySelectorAll('.page-check:checked'), cb => cb.closest('tr'))
+        .filter(tr => !tr.hidden)
+        .map(tr => tr.dataset.slug);
     if (!slugs.length) { toast('Sélectionnez des pages d\\'abord', 'error'); return; }
     openBulkModal(target, slugs);
 }
@@ -984,37 +1176,43 @@ async function confirmBulkModal() {
         options = { match_by: document.getElementById('modal-match-by').value };
     }
 
+    await flushRoutes();
     await api('POST', '/api/pages/bulk-route', { slugs, target, options });
     slugs.forEach(slug => {
-        const p = pages.find(x => x.slug === slug);
-        if (p) {
-            p.target = target;
+        for (const p of pagesBySlug.get(slug) || []) {
+            setPageTarget(p, target);
             p.options = { ...(p.options || {}), ...options };
+            syncRowTarget(p);
         }
     });
-    updateStats();
-    renderPages();
     closeBulkModal();
+    scheduleRerender();
     toast(`${slugs.length} éléments → ${targetLabel(target)}`, 'success');
 }
 
 async function autoCateg() {
+    await flushRoutes();
     const result = await api('POST', '/api/pages/auto-categorize');
-    await loadPages();
+    const routes = result.routes || {};
+    for (const p of pages) {
+        const target = routes[p.slug];
+        if (target && target !== p.target) {
+            setPageTarget(p, target);
+            syncRowTarget(p);
+        }
+    }
+    scheduleRerender();
     toast(`🤖 Auto: ${result.cms || 0} CMS, ${result.product || 0} Produits, ${result.skip || 0} Ignorées`, 'success');
 }
 
 // ── Detail panel ─────────────────────────────────────────────
-function showDetail(slug) {
-    const p = pages.find(x => x.slug === slug);
+let detailPage = null;  // page shown in the panel, which may not be the first with its slug
+function showDetail(slug, p = pagesBySlug.get(slug)?.[0]) {
     if (!p) return;
+    detailPage = p;
 
-    // Remove previous edit section if any
-    const oldEdit = document.getElementById('detail-edit-section');
-    if (oldEdit) oldEdit.remove();
-
-    document.getElementById('detail-title').textContent = p.title;
-    document.getElementById('detail-meta').innerHTML = `
+    // Build every fragment first, then write the panel in one pass
+    const metaHtml = `
         <dt>Slug</dt><dd><code>${p.slug}</code></dd>
         <dt>Type</dt><dd>${p.wp_type === 'post' ? '📝 Article' : '📃 Page'}</dd>
         <dt>Destination</dt><dd>${targetLabel(p.target)}</dd>
@@ -1037,7 +1235,7 @@ function showDetail(slug) {
     editHtml += `
         <div class="detail-edit-row">
             <label>Destination</label>
-            <select id="detail-target" onchange="detailChangeTarget('${p.slug}', this.value)">
+            <select id="detail-target" data-change="detailChangeTarget" data-arg="${p.slug}">
                 <option value="cms" ${p.target==='cms'?'selected':''}>📄 Page CMS</option>
                 <option value="product" ${p.target==='product'?'selected':''}>🏷️ Produit</option>
                 <option value="skip" ${p.target==='skip'?'selected':''}>⏭️ Ignorer</option>
@@ -1076,41 +1274,72 @@ function showDetail(slug) {
 
     editHtml += `
         <div style="margin-top:10px">
-            <button class="btn btn-sm btn-primary" onclick="saveDetailOptions('${p.slug}')">Sauvegarder</button>
+            <button class="btn btn-sm btn-primary" data-action="saveDetailOptions" data-arg="${p.slug}">Sauvegarder</button>
         </div>
     </div>`;
 
-    // Insert after meta
-    document.getElementById('detail-meta').insertAdjacentHTML('afterend',
+    const thumbs = document.createDocumentFragment();
+    for (const url of p.image_urls || []) thumbs.appendChild(thumbImg(url));
+
+    const oldEdit = document.getElementById('detail-edit-section');
+    if (oldEdit) oldEdit.remove();
+    els.detailTitle.textContent = p.title;
+    els.detailMeta.innerHTML = metaHtml;
+    els.detailMeta.insertAdjacentHTML('afterend',
         '<div id="detail-edit-section">' + editHtml + '</div>');
-    document.getElementById('detail-preview').textContent = p.content_preview || '(vide)';
-    document.getElementById('detail-thumbs').innerHTML = (p.image_urls || [])
-        .map(url => `<img src="${url}" onerror="this.style.display='none'" loading="lazy">`).join('');
+    els.detailPreview.textContent = p.content_preview || '(vide)';
+    if (thumbObserver) thumbObserver.disconnect();
+    els.detailThumbs.replaceChildren(thumbs);
+    if (thumbObserver) for (const img of els.detailThumbs.children) thumbObserver.observe(img);
+    els.detailPanel.classList.add('open');
+}
+
+// Thumbnails get their src when they come near the viewport; one observer and
+// one capturing error listener serve every image instead of per-image handlers
+const thumbObserver = window.IntersectionObserver ? new IntersectionObserver(entries => {
+    for (const e of entries) {
+        if (!e.isIntersecting) continue;
+        e.target.src = e.target.dataset.src;
+        thumbObserver.unobserve(e.target);
+    }
+}, { rootMargin: '200px' }) : null;
+els.detailThumbs.addEventListener('error', e => { e.target.style.display = 'none'; }, true);
 
-    document.getElementById('detail-panel').classList.add('open');
+function thumbImg(url) {
+    const img = document.createElement('img');
+    img.width = 100;
+    img.height = 70;
+    img.alt = '';
+    img.decoding = 'async';
+    img.fetchPriority = 'low';
+    if (thumbObserver) img.dataset.src = url;
+    else { img.loading = 'lazy'; img.src = url; }
+    return img;
 }
 
 function closeDetail() {
-    document.getElementById('detail-panel').classList.remove('open');
+    els.detailPanel.classList.remove('open');
 }
 
 function targetLabel(t) {
     return { cms: '📄 Page CMS', product: '🏷️ Produit', skip: '⏭️ Ignoré' }[t] || t;
 }
 
-async function detailChangeTarget(slug, target) {
-    await api('POST', '/api/pages/route', { slug, target });
-    const p = pages.find(x => x.slug === slug);
-    if (p) p.target = target;
-    updateStats();
-    renderPages();
+function detailChangeTarget(slug, target) {
+    queueRoute(slug, target);
+    for (const p of pagesBySlug.get(slug) || []) {
+        setPageTarget(p, target);
+        syncRowTarget(p);
+    }
+    scheduleRerender();
     // Re-open detail to refresh the options section
-    showDetail(slug);
+    showDetail(slug, detailPage?.slug === slug ? detailPage : undefined);
 }
 
 async function saveDetailOptions(slug) {
-    const p = pages.find(x => x.slug === slug);
-    if (!p) return;
+    const same = pagesBySlug.get(slug);
+    if (!same) return;
+    const p = same[0];
     let options = {};
 
     if (p.target === 'cms') {
@@ -1126,18 +1355,15 @@ async function saveDetailOptions(slug) {
     }
 
     await api('POST', '/api/pages/options', { slug, options });
-    p.options = { ...(p.options || {}), ...options };
+    for (const q of same) q.options = { ...(q.options || {}), ...options };
     toast('Options sauvegardées pour ' + p.title, 'success');
 }
 
 // ── Migration ────────────────────────────────────────────────
 function updateMigStats() {
-    const cms = pages.filter(p => p.target === 'cms').length;
-    const product = pages.filter(p => p.target === 'product').length;
-    const skip = pages.filter(p => p.target === 'skip').length;
-    document.getElementById('mig-cms').textContent = cms;
-    document.getElementById('mig-product').textContent = product;
-    document.getElementById('mig-skip').textContent = skip;
+    els.migCms.textContent = pageCounts.cms;
+    els.migProduct.textContent = pageCounts.product;
+    els.migSkip.textContent = pageCounts.skip;
 }
 
 async function startMigration(dryRun) {
@@ -1147,62 +1373,105 @@ async function startMigration(dryRun) {
 
     await saveConfig();
 
-    document.getElementById('mig-progress-card').style.display = 'block';
-    document.getElementById('btn-dry').disabled = true;
-    document.getElementById('btn-live').disabled = true;
+    els.migProgressCard.style.display = 'block';
+    els.migBar.classList.add('active');
+    els.btnDry.disabled = true;
+    els.btnLive.disabled = true;
 
     const result = await api('POST', '/api/migrate', { dry_run: dryRun });
     if (result.error) {
         toast(result.error, 'error');
-        document.getElementById('btn-dry').disabled = false;
-        document.getElementById('btn-live').disabled = false;
-        document.getElementById('mig-progress-card').style.display = 'none';
+        els.btnDry.disabled = false;
+        els.btnLive.disabled = false;
+        els.migBar.classList.remove('active');
+        els.migProgressCard.style.display = 'none';
         return;
     }
 
     toast(dryRun ? '🔍 Dry run lancé' : '🚀 Migration lancée', 'info');
-    pollMigrationStatus();
+    watchMigration();
+}
+
+// The server pushes progress and new log lines as they happen; polling is only a fallback
+function watchMigration() {
+    migrationLog = [];
+    renderedLogCount = 0;
+    els.migLog.textContent = '';
+    if (!window.EventSource) { pollMigrationStatus(); return; }
+
+    const es = new EventSource('/api/migrate/stream');
+    es.onmessage = e => {
+        const data = JSON.parse(e.data);
+        updateMigrationBar(data.progress);
+        appendMigrationLog(data.log, data.log_total);
+        if (!data.running) {
+            es.close();
+            finishMigration(data.progress, migrationLog);
+        }
+    };
+    es.onerror = () => {
+        // Stream dropped before the end of the migration
+        es.close();
+        pollMigrationStatus();
+    };
+}
+
+function updateMigrationBar(prog) {
+    const pct = prog.total > 0 ? Math.round((prog.current / prog.total) * 100) : 0;
+    els.migBar.style.width = pct + '%';
+    els.migBarText.textContent = `${prog.current}/${prog.total} (${pct}%)`;
+}
+
+// One scan per line; the first marker found decides the class
+const LOG_RE = /(✅)|(❌)|(⚠️)|[━═]/u;
+function logLineClass(line) {
+    const m = LOG_RE.exec(line);
+    if (!m) return '';
+    return m[1] ? 'log-success' : m[2] ? 'log-error' : m[3] ? 'log-warning' : 'log-info';
+}
+
+function logLineHtml(line) {
+    return `<div class="${logLineClass(line)}">${escHtml(line)}</div>`;
+}
+
+function appendMigrationLog(lines, total) {
+    renderedLogCount = total;
+    if (!lines.length) return;
+    migrationLog.push(...lines);
+    const logEl = els.migLog;
+    logEl.insertAdjacentHTML('beforeend', lines.map(logLineHtml).join(''));
+    logEl.scrollTop = logEl.scrollHeight;
+}
+
+function finishMigration(prog, log) {
+    els.migBar.classList.remove('active');
+    els.btnDry.disabled = false;
+    els.btnLive.disabled = false;
+
+    if (prog.status === 'done') {
+        toast('✅ Migration terminée !', 'success');
+        showResults(log, prog.stats);
+    } else if (prog.status === 'error') {
+        toast('❌ Erreur: ' + (prog.error || ''), 'error');
+    }
 }
 
 function pollMigrationStatus() {
     if (migrationPollInterval) clearInterval(migrationPollInterval);
     migrationPollInterval = setInterval(async () => {
-        const data = await api('GET', '/api/migrate/status');
-        const prog = data.progress;
-
-        // Update progress bar
-        const pct = prog.total > 0 ? Math.round((prog.current / prog.total) * 100) : 0;
-        document.getElementById('mig-bar').style.width = pct + '%';
-        document.getElementById('mig-bar-text').textContent = `${prog.current}/${prog.total} (${pct}%)`;
-
-        // Update log
-        const logEl = document.getElementById('mig-log');
-        logEl.innerHTML = data.log.map(line => {
-            let cls = '';
-            if (line.includes('✅')) cls = 'log-success';
-            else if (line.includes('❌')) cls = 'log-error';
-            else if (line.includes('⚠️')) cls = 'log-warning';
-            else if (line.includes('━') || line.includes('═')) cls = 'log-info';
-            return `<div class="${cls}">${escHtml(line)}</div>`;
-        }).join('');
-        logEl.scrollTop = logEl.scrollHeight;
+        // Only the lines appended since the previous tick come back
+        const data = await api('GET', '/api/migrate/status?since=' + renderedLogCount);
+        updateMigrationBar(data.progress);
+        appendMigrationLog(data.log, data.log_total);
 
         if (!data.running) {
             clearInterval(migrationPollInterval);
-            document.getElementById('btn-dry').disabled = false;
-            document.getElementById('btn-live').disabled = false;
-
-            if (prog.status === 'done') {
-                toast('✅ Migration terminée !', 'success');
-                showResults(data, prog.stats);
-            } else if (prog.status === 'error') {
-                toast('❌ Erreur: ' + (prog.error || ''), 'error');
-            }
+            finishMigration(data.progress, migrationLog);
         }
     }, 1000);
 }
 
-function showResults(data, stats) {
+function showResults(log, stats) {
     document.getElementById('results-empty').style.display = 'none';
     document.getElementById('results-content').style.display = 'block';
 
@@ -1217,14 +1486,7 @@ function showResults(data, stats) {
         `;
     }
 
-    document.getElementById('results-log').innerHTML = data.log
-        .map(line => {
-            let cls = '';
-            if (line.includes('✅')) cls = 'log-success';
-            else if (line.includes('❌')) cls = 'log-error';
-            else if (line.includes('⚠️')) cls = 'log-warning';
-            return `<div class="${cls}">${escHtml(line)}</div>`;
-        }).join('');
+    document.getElementById('results-log').innerHTML = log.map(logLineHtml).join('');
 
     switchTab('results');
 }
@@ -1235,13 +1497,193 @@ async function saveMappingOnly() {
     toast('Mapping sauvegardé dans config.yaml ✅', 'success');
 }
 
+// ── Theme ────────────────────────────────────────────────────
+function toggleTheme() {
+    const root = document.documentElement;
+    const theme = root.dataset.theme === 'light' ? 'dark' : 'light';
+    if (theme === 'light') root.dataset.theme = 'light';
+    else delete root.dataset.theme;
+    try { localStorage.setItem('theme', theme); } catch (e) {}
+}
+
+// ── Actions ──────────────────────────────────────────────────
+// Markup names its handler in data-action (click) / data-change (change) with an optional
+// data-arg; two document-level listeners dispatch them all.
+const ACTIONS = {
+    switchTab, saveConfig, testConnection, scanWordPress, autoCateg, saveMappingOnly,
+    closeDetail, closeBulkModal, confirmBulkModal, toggleTheme, saveDetailOptions, bulkAction,
+    setFilter,
+    startMigration: mode => startMigration(mode === 'dry'),
+    closeBulkModalOutside: (arg, el, e) => { if (e.target === el) closeBulkModal(); },
+};
+const CHANGE_ACTIONS = {
+    toggleAll: (arg, el) => toggleAll(el),
+    detailChangeTarget: (slug, el) => detailChangeTarget(slug, el.value),
+};
+document.addEventListener('click', e => {
+    const el = e.target.closest('[data-action]');
+    if (el) ACTIONS[el.dataset.action](el.dataset.arg, el, e);
+});
+document.addEventListener('change', e => {
+    const el = e.target.closest('[data-change]');
+    if (el) CHANGE_ACTIONS[el.dataset.change](el.dataset.arg, el, e);
+});
+els.searchPages.addEventListener('input', filterPages);
+
 // ── Keyboard shortcuts ───────────────────────────────────────
 document.addEventListener('keydown', (e) => {
     if (e.key === 'Escape') closeDetail();
 });
 
 // ── Init ─────────────────────────────────────────────────────
-loadConfig();
+// Pages survive a reload on the server side: fetch them alongside the config
+Promise.all([loadConfig(), loadPages().catch(() => null)]).then(() => {
+    if (!pages.length) return;
+    document.getElementById('scan-results').style.display = 'block';
+    document.getElementById('scan-empty').style.display = 'none';
+});
 </script>
 </body>
 </html>'''
+
+_CSS_COMMENT_RE = re.compile(r"""/\*.*?\*/|("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')""", re.S)
+_CSS_STRING_RE = re.compile(r"""("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')""")
+# No space is dropped before ":" since ".a :is(b)" and ".a:is(b)" are different selectors
+_CSS_PUNCT_RE = re.compile(r"\s*([{};,>+~])\s*|(:)\s+")
+_CSS_HEX_RE = re.compile(r"#([0-9a-fA-F])\1([0-9a-fA-F])\2([0-9a-fA-F])\3(?![0-9a-fA-F])")
+
+
+def _minify_css(src: str) -> str:
+    """Drop comments and redundant whitespace, shorten #aabbcc colors; quoted strings are kept as is."""
+    src = _CSS_COMMENT_RE.sub(lambda m: m.group(1) or "", src)
+    parts = _CSS_STRING_RE.split(src)
+    for i in range(0, len(parts), 2):  # odd indices are the quoted strings
+        code = " ".join(parts[i].split())
+        code = _CSS_PUNCT_RE.sub(lambda m: m.group(1) or m.group(2), code).replace(";}", "}")
+        parts[i] = _CSS_HEX_RE.sub(r"#\1\2\3", code)
+    return "".join(parts).strip()
+
+
+_CSS_VAR_REF_RE = re.compile(r"var\((--[\w-]+)\)")
+_CSS_ROOT_RE = re.compile(r":root\{([^}]*)\}")
+
+
+def _shake_css_vars(css: str, other: str) -> str:
+    """
+    Drop the :root custom properties that neither the (minified) stylesheet nor other
+    (page markup, deferred stylesheet) references, and inline the short ones used once
+    in the stylesheet.
+    """
+    css_refs = Counter(_CSS_VAR_REF_RE.findall(css))
+    html_refs = Counter(_CSS_VAR_REF_RE.findall(other))
+    root = _CSS_ROOT_RE.search(css)
+    decls = dict(d.split(":", 1) for d in root.group(1).split(";"))
+    for name in sorted((css_refs | html_refs).keys() - decls.keys()):
+        logger.warning(f"Variable CSS non définie : var({name})")
+
+    # Variables redeclared elsewhere (themes) must stay variables
+    outside = css[:root.start()] + css[root.end():]
+    themed = set(re.findall(r"(--[\w-]+):", outside))
+
+    kept, inline = [], {}
+    for name, value in decls.items():
+        uses = css_refs[name] + html_refs[name]
+        if uses == 1 and css_refs[name] and len(value) < 12 and name not in themed:
+            inline[name] = value
+        elif uses:
+            kept.append(f"{name}:{value}")
+    css = css[:root.start(1)] + ";".join(kept) + css[root.end(1):]
+    for name, value in inline.items():
+        css = css.replace(f"var({name})", value)
+    return css
+
+
+_CSS_SECTION_RE = re.compile(r"^/\* ── (.+?) ─+ \*/$", re.M)
+# Rules for elements that don't show on first paint (the Config tab); they load after the
+# page renders. The detail panel and modal stay critical: their markup would flash
+# unstyled before their off-screen/transparent rules arrived.
+_CSS_DEFERRED_SECTIONS = frozenset({"Migration log", "Progress bar", "Toast notifications"})
+
+
+def _split_css(css: str) -> tuple[str, str]:
+    """Split the stylesheet on its section banners into (critical, deferred)."""
+    parts = _CSS_SECTION_RE.split(css)
+    critical, deferred = [parts[0]], []
+    for i in range(1, len(parts), 2):
+        (deferred if parts[i] in _CSS_DEFERRED_SECTIONS else critical).append(parts[i + 1])
+    return "".join(critical), "".join(deferred)
+
+
+def _encodings(body: bytes) -> list[tuple[str | None, bytes]]:
+    """Pre-compressed variants of body, most preferred first; None is the identity encoding."""
+    variants = []
+    if brotli is not None:
+        variants.append(("br", brotli.compress(body, quality=11)))
+    variants.append(("gzip", gzip.compress(body, compresslevel=9, mtime=0)))
+    variants.append((None, body))
+    return variants
+
+
+def accepts_encoding(accept_encoding: str, encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows `encoding` (q=0 refuses it, * covers the rest)."""
+    wildcard = False
+    for token in accept_encoding.split(","):
+        name, _, params = token.partition(";")
+        name = name.strip().lower()
+        if name != encoding and name != "*":
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name == encoding:
+            return q > 0
+        wildcard = q > 0
+    return wildcard
+
+
+def _negotiate(variants: list[tuple[str | None, bytes]], accept_encoding: str) -> tuple[bytes, str | None]:
+    for encoding, body in variants:
+        if encoding is None or accepts_encoding(accept_encoding, encoding):
+            return body, encoding
+
+
+# Built once at import: the page never changes during the process lifetime.
+# Critical rules are inlined; the deferred stylesheet lives at a content-hashed URL so
+# browsers can cache it forever.
+_CSS_CRITICAL, _CSS_DEFERRED = (_minify_css(part) for part in _split_css(_CSS))
+_CSS_CRITICAL = _shake_css_vars(_CSS_CRITICAL, _BODY + _CSS_DEFERRED)
+_CSS_BYTES = _CSS_DEFERRED.encode("utf-8")
+CSS_VARIANTS = _encodings(_CSS_BYTES)
+CSS_PATH = f"/static/gui-{hashlib.sha1(_CSS_BYTES).hexdigest()[:10]}.css"
+
+# Only the small head fragment is rewritten; the 40 KB body is joined in untouched
+_HTML = "".join((
+    _HEAD_OPEN, "<style>", _CSS_CRITICAL, "</style>", _HEAD_CLOSE.replace("__CSS_PATH__", CSS_PATH), _BODY,
+))
+_HTML_BYTES = _HTML.encode("utf-8")
+HTML_VARIANTS = _encodings(_HTML_BYTES)
+_HTML_HASH = hashlib.sha256(_HTML_BYTES).hexdigest()[:16]
+# Strong validators differ per content-coding, or a cache could answer 304 for the wrong variant
+HTML_ETAGS = {
+    encoding: f'"{_HTML_HASH}-{encoding}"' if encoding else f'"{_HTML_HASH}"'
+    for encoding, _ in HTML_VARIANTS
+}
+
+
+def get_html() -> str:
+    return _HTML
+
+
+def get_html_bytes(accept_encoding: str) -> tuple[bytes, str | None]:
+    """Return (body, content-encoding) for the client's Accept-Encoding header."""
+    return _negotiate(HTML_VARIANTS, accept_encoding)
+
+
+def get_css_bytes(accept_encoding: str) -> tuple[bytes, str | None]:
+    """Same as get_html_bytes, for the deferred stylesheet served at CSS_PATH."""
+    return _negotiate(CSS_VARIANTS, accept_encoding)
@@ -10,10 +10,26 @@ import json
 import os
 import re
 import sys
-from typing import Any, Optional
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, Optional
 
 import requests
-import yaml
+from requests.adapters import HTTPAdapter
+
+from .config import read_yaml, write_yaml
+
+# orjson decodes the REST batches straight from bytes; stdlib json is the fallback
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
 
 
 # ── ANSI colors ──────────────────────────────────────────────────
@@ -48,13 +64,23 @@ class C:
 
 # ── Helpers ──────────────────────────────────────────────────────
 
+# Patterns used per page and per command, compiled once
+# Image tags are counted on the UTF-8 body that _page_meta already encodes for its size
+_IMG_RE = re.compile(rb'<img[^>]+src=', re.I)
+_TAG_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
+_SPLIT_RE = re.compile(r'[,\s]+')
+_AMBASSADOR_SLUG_RE = re.compile(r'^[a-z]+-[a-z]+(-\d+)?$')
+_DIVI_RE = re.compile(r'et_pb_', re.I)
+_WPCF7_RE = re.compile(r'wpcf7', re.I)
+_TABLE_RE = re.compile(r'<table|wptb-', re.I)
+
+
 def _clean_title(raw: dict) -> str:
     return html.unescape(raw.get("title", {}).get("rendered", "(sans titre)"))
 
 
-def _content_size(raw: dict) -> str:
-    content = raw.get("content", {}).get("rendered", "")
-    size = len(content.encode("utf-8"))
+def _format_size(size: int) -> str:
     if size < 1024:
         return f"{size} B"
     elif size < 1024 * 1024:
@@ -62,16 +88,26 @@ def _content_size(raw: dict) -> str:
     return f"{size / (1024 * 1024):.1f} MB"
 
 
-def _image_count(raw: dict) -> int:
-    content = raw.get("content", {}).get("rendered", "")
-    return len(re.findall(r'<img[^>]+src=', content, re.I))
+def _image_count(data: bytes) -> int:
+    return len(_IMG_RE.findall(data))
+
+
+def _page_meta(raw: dict) -> dict:
+    """Values the list shows on every redraw, computed once per page after the fetch."""
+    data = raw.get("content", {}).get("rendered", "").encode("utf-8")
+    return {
+        "slug": raw.get("slug", ""),
+        "title": _clean_title(raw),
+        "size": len(data),
+        "imgs": _image_count(data),
+    }
 
 
-def _auto_category(slug: str, title: str, page: dict) -> str:
+def _auto_category(meta: dict) -> str:
     """Heuristic auto-categorization."""
-    content_html = page.get("content", {}).get("rendered", "")
-    img_count = _image_count(page)
-    size = len(content_html.encode("utf-8"))
+    slug, title = meta["slug"], meta["title"]
+    img_count = meta["imgs"]
+    size = meta["size"]
 
     # Known product patterns
     product_keywords = [
@@ -84,7 +120,7 @@ def _auto_category(slug: str, title: str, page: dict) -> str:
         return "product"
 
     # Check slugs that look like ambassador profiles (First-Last pattern)
-    if re.match(r'^[a-z]+-[a-z]+(-\d+)?$', slug) and title.replace(" ", "").isalpha():
+    if _AMBASSADOR_SLUG_RE.match(slug) and title.replace(" ", "").isalpha():
         words = title.split()
         if len(words) >= 2 and words[0][0].isupper() and words[-1][0].isupper():
             return "ambassador"
@@ -106,37 +142,101 @@ def _auto_category(slug: str, title: str, page: dict) -> str:
 
 # ── WordPress fetcher ────────────────────────────────────────────
 
-def fetch_all_pages(wp_url: str) -> list[dict]:
-    """Fetch all published pages from WP REST API."""
-    api_base = wp_url.rstrip("/") + "/wp-json/wp/v2"
-    all_pages = []
-    page_num = 1
+_FETCH_WORKERS = 8  # concurrent batch requests once the batch count is known
+HTTP_CACHE_PATH = ".wp_wizard_cache.json"  # last batch bodies + ETag/Last-Modified, one site
 
-    while True:
-        url = f"{api_base}/pages"
-        params = {
-            "per_page": 100, "page": page_num, "status": "publish",
-            "_fields": "id,title,content,excerpt,slug,date,modified,featured_media,yoast_head_json",
-        }
-        try:
-            resp = requests.get(url, params=params, timeout=30)
-            resp.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            print(f"  {C.RED}❌ Erreur API (batch {page_num}): {e}{C.RESET}")
-            break
+# Keep-alive connections shared by the concurrent batch requests
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=2, pool_maxsize=_FETCH_WORKERS)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
+
+def _load_http_cache() -> dict:
+    try:
+        with open(HTTP_CACHE_PATH, "rb") as f:
+            cache = _json_loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_http_cache(cache: dict):
+    try:
+        with open(HTTP_CACHE_PATH, "wb") as f:
+            f.write(_json_dumps(cache))
+    except OSError as e:
+        print(f"  {C.YELLOW}⚠️ Cache WordPress non écrit: {e}{C.RESET}")
 
-        pages = resp.json()
-        if not pages:
-            break
-        all_pages.extend(pages)
-        print(f"  {C.GREEN}📥{C.RESET} Batch {page_num}: {len(pages)} pages")
 
+def iter_page_batches(wp_url: str, refresh: bool = False) -> Iterator[list[dict]]:
+    """
+    Yield the published pages of the WP REST API one batch at a time, so the caller
+    can process a batch while the following ones are still downloading.
+    Batch 1 reveals X-WP-TotalPages; the remaining batches are then requested concurrently
+    and consumed in order, so a failing batch still ends the listing there.
+    Batches are revalidated with the ETag/Last-Modified of the previous run and a
+    304 reuses the stored body; `refresh` ignores the stored batches.
+    """
+    url = wp_url.rstrip("/") + "/wp-json/wp/v2/pages"
+    # Only what the wizard reads: content feeds the size/image counts behind the
+    # auto-categorization, yoast_head_json and modified the detail view
+    fields = "id,title,content,slug,modified,yoast_head_json"
+    cache = {} if refresh else _load_http_cache()
+    fresh = {}  # this run's cacheable batches; replaces the file afterwards
+
+    def fetch(page_num: int) -> tuple[list[dict], int, bool]:
+        """(pages, X-WP-TotalPages, served from cache)"""
+        key = f"{url}?page={page_num}&_fields={fields}"
+        hit = cache.get(key)
+        headers = {}
+        if hit:
+            if hit.get("etag"):
+                headers["If-None-Match"] = hit["etag"]
+            if hit.get("last_modified"):
+                headers["If-Modified-Since"] = hit["last_modified"]
+        params = {"per_page": 100, "page": page_num, "status": "publish", "_fields": fields}
+        resp = _SESSION.get(url, params=params, headers=headers, timeout=30)
+        if resp.status_code == 304 and hit:
+            fresh[key] = hit
+            return hit["body"], hit["total_pages"], True
+        resp.raise_for_status()
+        body = _json_loads(resp.content)
         total_pages = int(resp.headers.get("X-WP-TotalPages", 1))
-        if page_num >= total_pages:
-            break
-        page_num += 1
+        etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        if etag or last_modified:
+            fresh[key] = {"etag": etag, "last_modified": last_modified,
+                          "total_pages": total_pages, "body": body}
+        return body, total_pages, False
 
-    return all_pages
+    page_num = 1
+    failed = False
+    try:
+        pages, total_pages, cached = fetch(page_num)
+        with ThreadPoolExecutor(max_workers=max(1, min(_FETCH_WORKERS, total_pages - 1))) as pool:
+            rest = pool.map(fetch, range(2, total_pages + 1))
+            while True:
+                if not pages:
+                    break
+                note = f" {C.DIM}(cache){C.RESET}" if cached else ""
+                print(f"  {C.GREEN}📥{C.RESET} Batch {page_num}: {len(pages)} pages{note}")
+                yield pages
+                if page_num >= total_pages:
+                    break
+                page_num += 1
+                pages, _, cached = next(rest)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"  {C.RED}❌ Erreur API (batch {page_num}): {e}{C.RESET}")
+        failed = True
+
+    if fresh or cache:
+        # After a failure the batches not reached this time keep their previous entry
+        _save_http_cache({**cache, **fresh} if failed else fresh)
+
+
+def fetch_all_pages(wp_url: str, refresh: bool = False) -> list[dict]:
+    """Fetch all published pages from WP REST API."""
+    return [page for batch in iter_page_batches(wp_url, refresh) for page in batch]
 
 
 # ── Interactive UI ───────────────────────────────────────────────
@@ -164,17 +264,17 @@ def target_badge(target: str) -> str:
     return C.badge("❓ ???", C.BG_GRAY)
 
 
-def display_page_list(pages: list[dict], assignments: dict[str, str]):
-    """Display all pages with their current assignment."""
+def display_page_list(metas: list[dict], assignments: dict[str, str]):
+    """Display all pages (as _page_meta records) with their current assignment."""
     print()
     print(f"  {C.BOLD}{C.WHITE}{'#':>4}  {'Destination':<16} {'Slug':<35} {'Titre':<30} {'Taille':>8} {'Img':>4}{C.RESET}")
     print_separator("─", 100)
 
-    for i, page in enumerate(pages):
-        slug = page.get("slug", "")
-        title = _clean_title(page)[:30]
-        size = _content_size(page)
-        imgs = _image_count(page)
+    for i, meta in enumerate(metas):
+        slug = meta["slug"]
+        title = meta["title"][:30]
+        size = _format_size(meta["size"])
+        imgs = meta["imgs"]
         target = assignments.get(slug, "skip")
 
         # Color coding
@@ -196,10 +296,8 @@ def display_page_list(pages: list[dict], assignments: dict[str, str]):
         print(f"  {C.DIM}{num}{C.RESET}  {color}{dest}{C.RESET}  {slug:<35} {title:<30} {C.DIM}{size:>8} {imgs:>4}{C.RESET}")
 
     print_separator("─", 100)
-    cms_count = sum(1 for v in assignments.values() if v == "cms")
-    prod_count = sum(1 for v in assignments.values() if v == "product")
-    skip_count = sum(1 for v in assignments.values() if v == "skip")
-    print(f"  {C.CYAN}📄 CMS: {cms_count}{C.RESET}  │  {C.MAGENTA}🏷️ Produit: {prod_count}{C.RESET}  │  {C.GRAY}⏭️ Ignoré: {skip_count}{C.RESET}  │  Total: {len(pages)}")
+    counts = Counter(assignments.values())
+    print(f"  {C.CYAN}📄 CMS: {counts['cms']}{C.RESET}  │  {C.MAGENTA}🏷️ Produit: {counts['product']}{C.RESET}  │  {C.GRAY}⏭️ Ignoré: {counts['skip']}{C.RESET}  │  Total: {len(metas)}")
     print()
 
 
@@ -212,7 +310,7 @@ def get_page_indices(prompt: str, total: int) -> list[int]:
         return list(range(total))
 
     indices = []
-    for part in re.split(r'[,\s]+', raw):
+    for part in _SPLIT_RE.split(raw):
         if "-" in part:
             start, end = part.split("-", 1)
             try:
@@ -231,23 +329,32 @@ def get_page_indices(prompt: str, total: int) -> list[int]:
     return sorted(set(indices))
 
 
-def interactive_wizard(wp_url: str, config_path: str = "config.yaml") -> Optional[dict]:
+def interactive_wizard(wp_url: str, config_path: str = "config.yaml",
+                       refresh: bool = False) -> Optional[dict]:
     """
     Main interactive wizard. Returns the final assignments dict
-    or None if the user cancels.
+    or None if the user cancels. `refresh` bypasses the local WordPress cache.
     """
     print_header()
 
     # ── Step 1: Scan WordPress ───────────────────────────────────
     print(f"  {C.BOLD}Étape 1/4 — Scan de {C.CYAN}{wp_url}{C.RESET}")
     print_separator()
-    pages = fetch_all_pages(wp_url)
-
-    if not pages:
+    # Each batch is measured and categorized while the next ones are in flight
+    scanned = []
+    for batch in iter_page_batches(wp_url, refresh=refresh):
+        for page in batch:
+            meta = _page_meta(page)
+            meta["cat"] = _auto_category(meta)
+            scanned.append((page, meta))
+
+    if not scanned:
         print(f"\n  {C.RED}❌ Aucune page trouvée. Vérifiez l'URL.{C.RESET}")
         return None
 
-    pages.sort(key=lambda p: p.get("slug", ""))
+    scanned.sort(key=lambda pm: pm[1]["slug"])
+    pages = [page for page, _ in scanned]
+    metas = [meta for _, meta in scanned]
     print(f"\n  {C.GREEN}✅ {len(pages)} pages trouvées{C.RESET}")
     print()
 
@@ -261,10 +368,9 @@ def interactive_wizard(wp_url: str, config_path: str = "config.yaml") -> Optiona
         "category": [], "other": [],
     }
 
-    for i, page in enumerate(pages):
-        slug = page.get("slug", "")
-        title = _clean_title(page)
-        cat = _auto_category(slug, title, page)
+    for i, meta in enumerate(metas):
+        slug = meta["slug"]
+        cat = meta["cat"]
         categories[cat].append(i)
 
         # Default assignment based on category
@@ -290,7 +396,7 @@ def interactive_wizard(wp_url: str, config_path: str = "config.yaml") -> Optiona
     print()
 
     while True:
-        display_page_list(pages, assignments)
+        display_page_list(metas, assignments)
 
         print(f"  {C.BOLD}Actions disponibles :{C.RESET}")
         print(f"    {C.CYAN}c <numéros>{C.RESET}  →  Mettre en Page CMS     (ex: c 1-5 8 12)")
@@ -321,7 +427,7 @@ def interactive_wizard(wp_url: str, config_path: str = "config.yaml") -> Optiona
             try:
                 idx = int(action.split()[1]) - 1
                 if 0 <= idx < len(pages):
-                    _show_page_detail(pages[idx], assignments)
+                    _show_page_detail(pages[idx], metas[idx], assignments)
                 else:
                     print(f"  {C.RED}Numéro invalide.{C.RESET}")
             except (ValueError, IndexError):
@@ -336,7 +442,7 @@ def interactive_wizard(wp_url: str, config_path: str = "config.yaml") -> Optiona
             rest = action[1:].strip()
             if rest:
                 indices = []
-                for part in re.split(r'[,\s]+', rest):
+                for part in _SPLIT_RE.split(rest):
                     if "-" in part:
                         try:
                             s, e = part.split("-", 1)
@@ -356,8 +462,7 @@ def interactive_wizard(wp_url: str, config_path: str = "config.yaml") -> Optiona
 
             if indices:
                 for idx in indices:
-                    slug = pages[idx].get("slug", "")
-                    assignments[slug] = target
+                    assignments[metas[idx]["slug"]] = target
                 target_label = {"cms": "📄 CMS", "product": "🏷️ Produit", "skip": "⏭️ Ignoré"}[target]
                 print(f"  {C.GREEN}✓ {len(indices)} page(s) → {target_label}{C.RESET}")
             else:
@@ -416,8 +521,7 @@ def interactive_wizard(wp_url: str, config_path: str = "config.yaml") -> Optiona
     # Save or merge with existing config
     mapping_file = "mapping.yaml"
     try:
-        with open(mapping_file, "w", encoding="utf-8") as f:
-            yaml.dump(mapping, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        write_yaml(mapping_file, mapping)
         print(f"  {C.GREEN}✅ Mapping sauvegardé → {mapping_file}{C.RESET}")
     except Exception as e:
         print(f"  {C.RED}❌ Erreur sauvegarde: {e}{C.RESET}")
@@ -425,11 +529,9 @@ def interactive_wizard(wp_url: str, config_path: str = "config.yaml") -> Optiona
     # Also try to merge into existing config.yaml
     if os.path.exists(config_path):
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                existing = yaml.safe_load(f) or {}
+            existing = read_yaml(config_path)
             existing["mapping"] = mapping["mapping"]
-            with open(config_path, "w", encoding="utf-8") as f:
-                yaml.dump(existing, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+            write_yaml(config_path, existing)
             print(f"  {C.GREEN}✅ Mapping intégré dans → {config_path}{C.RESET}")
         except Exception as e:
             print(f"  {C.YELLOW}⚠️ Config existant non modifié: {e}{C.RESET}")
@@ -459,19 +561,19 @@ def interactive_wizard(wp_url: str, config_path: str = "config.yaml") -> Optiona
     }
 
 
-def _show_page_detail(page: dict, assignments: dict):
+def _show_page_detail(page: dict, meta: dict, assignments: dict):
     """Show detailed info about a single page."""
-    slug = page.get("slug", "")
-    title = _clean_title(page)
+    slug = meta["slug"]
+    title = meta["title"]
     content_html = page.get("content", {}).get("rendered", "")
     yoast = page.get("yoast_head_json", {}) or {}
-    imgs = _image_count(page)
-    size = _content_size(page)
+    imgs = meta["imgs"]
+    size = _format_size(meta["size"])
     target = assignments.get(slug, "?")
 
     # Text preview
-    text = re.sub(r'<[^>]+>', ' ', content_html)
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _TAG_RE.sub(' ', content_html)
+    text = _WS_RE.sub(' ', text).strip()
     text = html.unescape(text)[:400]
 
     print()
@@ -487,9 +589,9 @@ def _show_page_detail(page: dict, assignments: dict):
     print(f"  Modifié:       {page.get('modified', 'N/A')[:10]}")
 
     # Content warnings
-    has_divi = bool(re.search(r'et_pb_', content_html, re.I))
-    has_forms = bool(re.search(r'wpcf7', content_html, re.I))
-    has_tables = bool(re.search(r'<table|wptb-', content_html, re.I))
+    has_divi = bool(_DIVI_RE.search(content_html))
+    has_forms = bool(_WPCF7_RE.search(content_html))
+    has_tables = bool(_TABLE_RE.search(content_html))
 
     if has_divi or has_forms or has_tables:
         print(f"  {C.YELLOW}Alertes:{C.RESET}", end="")
@@ -519,7 +621,7 @@ def _show_page_detail(page: dict, assignments: dict):
 
 # ── Entry point ──────────────────────────────────────────────────
 
-def run_interactive(wp_url: str = None, config_path: str = "config.yaml"):
+def run_interactive(wp_url: str = None, config_path: str = "config.yaml", refresh: bool = False):
     """Main entry point for interactive mode."""
     if not wp_url:
         print_header()
@@ -536,7 +638,7 @@ def run_interactive(wp_url: str = None, config_path: str = "config.yaml"):
     if not wp_url.startswith("http"):
         wp_url = "https://" + wp_url
 
-    result = interactive_wizard(wp_url, config_path)
+    result = interactive_wizard(wp_url, config_path, refresh=refresh)
 
     if result and result.get("run_migration"):
         print()
@@ -6,6 +6,7 @@ CLI entry point.
 Usage:
     python -m src --interactive                              # Interactive wizard
     python -m src --interactive --url https://example.com    # Wizard with pre-set URL
+    python -m src --interactive --refresh                    # Wizard, bypassing the local WP cache
     python -m src --config config.yaml --dry-run             # Automated dry-run
     python -m src --config config.yaml                       # Automated live migration
 """
@@ -41,6 +42,11 @@ Modes:
         default=None,
         help="WordPress URL (for interactive mode)",
     )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Interactive mode: ignore the local WordPress cache and re-download every page",
+    )
 
     # Automated mode
     parser.add_argument(
@@ -67,11 +73,15 @@ def main() -> int:
     # ── Interactive mode ─────────────────────────────────────────
     if args.interactive:
         from .interactive import run_interactive
-        run_interactive(wp_url=args.url, config_path=args.config)
+        run_interactive(wp_url=args.url, config_path=args.config, refresh=args.refresh)
         return 0
 
     # ── Automated mode ───────────────────────────────────────────
-    config = load_config(args.config)
+    try:
+        config = load_config(args.config)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
 
     if args.dry_run:
         config.migration.dry_run = True
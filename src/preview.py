@@ -35,27 +35,44 @@ WP_CLASSES_RE = re.compile(
     re.IGNORECASE,
 )
 
+IMG_SRC_RE = re.compile(r'<img[^>]+src=["\']([^"\']+)["\']', re.I)
+TAG_RE = re.compile(r'<[^>]+>')
+SLUG_INVALID_RE = re.compile(r'[^a-z0-9-]')
+DASHES_RE = re.compile(r'-+')
+CF7_RE = re.compile(r'wpcf7|contact-form', re.I)
+SHORTCODE_RE = re.compile(r'\[/?[a-z_]+')
+TABLE_RE = re.compile(r'<table|wptb-', re.I)
+DIVI_RE = re.compile(r'et_pb_|et_builder', re.I)
+
 
 def count_images(html_content: str) -> list[str]:
-    return re.findall(r'<img[^>]+src=["\']([^"\']+)["\']', html_content, re.I)
+    return IMG_SRC_RE.findall(html_content)
 
 
 def extract_text_preview(html_content: str, max_len: int = 300) -> str:
-    text = re.sub(r'<[^>]+>', ' ', html_content)
-    text = re.sub(r'\s+', ' ', text).strip()
-    text = html.unescape(text)
+    # Strip only the shortest prefix (cut just after a '>') holding more than
+    # max_len characters of text, instead of walking the whole body
+    window = (max_len + 1) * 4
+    while True:
+        cut = html_content.find('>', window) + 1
+        chunk = html_content[:cut] if cut else html_content
+        text = ' '.join(TAG_RE.sub(' ', chunk).split())
+        text = html.unescape(text)
+        if not cut or len(text) > max_len:
+            break
+        window *= 4
     return text[:max_len] + '…' if len(text) > max_len else text
 
 
 def sanitize_slug(slug: str) -> str:
     slug = slug.lower().strip()
-    slug = re.sub(r'[^a-z0-9-]', '-', slug)
-    slug = re.sub(r'-+', '-', slug).strip('-')
+    slug = SLUG_INVALID_RE.sub('-', slug)
+    slug = DASHES_RE.sub('-', slug).strip('-')
     return slug[:128]
 
 
 def content_size_human(content: str) -> str:
-    size = len(content.encode('utf-8'))
+    size = len(content) if content.isascii() else len(content.encode('utf-8'))
     if size < 1024:
         return f"{size} B"
     elif size < 1024 * 1024:
@@ -111,10 +128,10 @@ def analyze_page(page: dict, route: Optional[dict] = None) -> dict:
     meta_desc = yoast.get('description', '')
     images = count_images(content_html)
 
-    has_forms = bool(re.search(r'wpcf7|contact-form', content_html, re.I))
-    has_shortcodes = bool(re.search(r'\[/?[a-z_]+', content_html))
-    has_tables = bool(re.search(r'<table|wptb-', content_html, re.I))
-    has_divi = bool(re.search(r'et_pb_|et_builder', content_html, re.I))
+    has_forms = bool(CF7_RE.search(content_html))
+    has_shortcodes = bool(SHORTCODE_RE.search(content_html))
+    has_tables = bool(TABLE_RE.search(content_html))
+    has_divi = bool(DIVI_RE.search(content_html))
 
     warnings = []
     if has_forms:
@@ -490,10 +507,9 @@ def main():
     # Load routing config if provided
     if args.config:
         try:
-            import yaml
+            from .config import read_yaml
             from .router import build_router_from_config
-            with open(args.config, 'r', encoding='utf-8') as f:
-                raw_config = yaml.safe_load(f)
+            raw_config = read_yaml(args.config)
             mapping_config = raw_config.get('mapping', {})
             if mapping_config.get('rules'):
                 router = build_router_from_config(mapping_config)